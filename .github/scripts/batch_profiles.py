@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Batch Profile Renderer
+Renders profile assets for a whole list of accounts from one process
+
+The accounts file is a JSON list, one object per account:
+
+    [{"login": "alice", "out": "profiles/alice", "velog": "alice",
+      "cards": [{"repo": "tool", "cmd": "pip install tool"}]}, ...]
+
+out (default profiles/<login>) is the account's output directory, laid out
+like this repository: assets/languages-donut*.svg (every theme and size)
+and github-isocalendar.svg are always written, and README.md /
+assets/terminal-hero*.svg have their marker regions refreshed if they are
+there. velog is optional; without it there is no writing
+section. cards (optional, in update_profile.PROJECT_CARDS's shape) are the
+account's project cards, written to assets/card-<repo>.svg. Each account keeps its own caches and build manifest under
+$PROFILE_CACHE_DIR/accounts/<login>.
+
+Every account's fetches share one bounded thread pool (and the one pooled
+GitHub client), and the CPU-bound work — hero, calendar and cards, and
+each account's language model with its hue and ring search — goes to a
+process pool, so the run takes about accounts / concurrency fetch rounds
+rather than one per account. Each account's donut variants are then drawn
+from its one model on its own thread.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import fixtures
+import update_profile as up
+
+
+def load_accounts(path: str) -> List[Dict]:
+    """The accounts file's entries, with out defaulted and logins checked"""
+    with open(path, encoding="utf-8") as f:
+        accounts = json.load(f)
+    seen = set()
+    for account in accounts:
+        login = account.get("login")
+        if not login or login in seen:
+            raise ValueError(f"account entries need a unique login (got {login!r})")
+        seen.add(login)
+        account.setdefault("out", os.path.join("profiles", login))
+    return accounts
+
+
+def _timed(fetch: Callable) -> Tuple[object, float]:
+    started = time.monotonic()
+    return fetch(), time.monotonic() - started
+
+
+def submit_fetches(account: Dict, pool: Executor) -> Dict[str, Future]:
+    """Queue one account's sources on the shared fetch pool"""
+    login = account["login"]
+    cache = os.path.join(up.CACHE_DIR, "accounts", login)
+    list_repos = functools.partial(up.iter_repos_cached,
+                                   cache_path=os.path.join(cache, "languages.json"))
+    store = up.ContributionStore(os.path.join(cache, "contributions"))
+    cards = [card["repo"] for card in account.get("cards", [])]
+    futures = {"github": pool.submit(_timed, functools.partial(up.fetch_github, list_repos, login,
+                                                               store, cards))}
+    if account.get("velog"):
+        futures["writing"] = pool.submit(_timed, functools.partial(
+            up.fetch_velog_writing, url=up.VELOG_FEED.format(handle=account["velog"]),
+            cache_path=os.path.join(cache, "velog.json")))
+    return futures
+
+
+def finish_account(account: Dict, fetches: Dict[str, Future], renderers: Executor) -> Dict:
+    """Wait for an account's data, then render and write what is stale; its timings.
+
+    There is no overall deadline here: a late account may simply be queued
+    behind others, and every request already has its own socket timeout.
+    """
+    login, root = account["login"], account["out"]
+    report = {"login": login, "status": "ok", "changed": []}
+    try:
+        github, report["fetch_s"] = fetches["github"].result()
+        writing = None
+        if "writing" in fetches:
+            try:
+                writing, report["writing_s"] = fetches["writing"].result()
+            except Exception as e:
+                print(f"⚠️  {login}: writing unavailable ({e!r})")
+
+        started = time.monotonic()
+        os.makedirs(os.path.join(root, "assets"), exist_ok=True)
+        graph = up.artifact_graph(
+            github["summary"], github["contributions"], github["calendar"], writing,
+            owner=login, root=root,
+            manifest=os.path.join(up.CACHE_DIR, "accounts", login, "build.json"),
+            skip_missing=True, cards=account.get("cards", []))
+        patches = graph.build(renderers)
+        report["render_s"] = time.monotonic() - started
+
+        started = time.monotonic()
+        report["changed"] = up.write_patches(patches)
+        graph.record()
+        report["write_s"] = time.monotonic() - started
+    except Exception as e:
+        report["status"] = f"failed: {e!r}"
+        print(f"❌ {login}: {e!r}")
+    return report
+
+
+def run_batch(accounts: List[Dict], concurrency: int = 8, workers: int = None) -> List[Dict]:
+    """Render every account; one report per account, in the order given.
+
+    concurrency bounds the requests in flight across all accounts, workers
+    the render processes. Accounts are finished as their data arrives, on
+    as many threads as there are render workers, so writing one account
+    never waits for another's fetch.
+    """
+    workers = workers or os.cpu_count() or 1
+    up.github_client().resize(concurrency)
+    batch_started = time.monotonic()
+
+    fetch_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+    render_pool = ProcessPoolExecutor(max_workers=workers)
+    finish_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account")
+    try:
+        fetches = [submit_fetches(account, fetch_pool) for account in accounts]
+        futures = [finish_pool.submit(finish_account, account, account_fetches, render_pool)
+                   for account, account_fetches in zip(accounts, fetches)]
+        reports = []
+        for future in futures:
+            report = future.result()
+            report["done_s"] = time.monotonic() - batch_started
+            reports.append(report)
+    finally:
+        finish_pool.shutdown()
+        fetch_pool.shutdown(cancel_futures=True)
+        render_pool.shutdown(cancel_futures=True)
+    return reports
+
+
+def print_reports(reports: List[Dict], elapsed: float):
+    """Per-account timing table, then the totals"""
+    print(f"\n{'account':<24} {'fetch':>7} {'writing':>8} {'render':>7} {'write':>7}  result")
+    for r in reports:
+        cells = [f"{r[key]:.2f}s" if key in r else "-" for key in ("fetch_s", "writing_s", "render_s", "write_s")]
+        result = r["status"] if r["status"] != "ok" else f"{len(r['changed'])} changed"
+        print(f"{r['login']:<24} {cells[0]:>7} {cells[1]:>8} {cells[2]:>7} {cells[3]:>7}  {result}")
+    failed = sum(r["status"] != "ok" for r in reports)
+    print(f"\n⏱️  {len(reports)} accounts in {elapsed:.1f}s ({failed} failed)")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("accounts", help="JSON list of {login, out, velog, cards} objects")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="requests in flight at once, across all accounts")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render processes (default: one per CPU)")
+    parser.add_argument("--report", metavar="PATH", help="also write the per-account timings as JSON")
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument("--record", metavar="PATH", help="save every response to a fixture file")
+    sources.add_argument("--replay", metavar="PATH", help="answer every request from a fixture file")
+    args = parser.parse_args()
+
+    accounts = load_accounts(args.accounts)
+    if args.record:
+        fixtures.record(args.record)
+    elif args.replay:
+        fixtures.replay(args.replay)
+    print(f"🚀 Rendering {len(accounts)} accounts "
+          f"({args.concurrency} concurrent fetches, {args.workers or os.cpu_count()} render workers)...")
+    started = time.monotonic()
+    try:
+        reports = run_batch(accounts, args.concurrency, args.workers)
+    finally:
+        if args.record:
+            print(f"📼 {fixtures.save()} responses recorded to {args.record}")
+    print_reports(reports, time.monotonic() - started)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    if any(r["status"] != "ok" for r in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the profile updater, on synthetic large-scale inputs
+
+Every pipeline stage runs against fixtures far bigger than the real profile:
+5,000 repos over 60 languages, a ten-year contribution calendar, a 20 MB RSS
+feed served from a local HTTP server, and colour rings of 6 to 16 segments.
+Each case is timed (median of several runs) and memory-profiled (tracemalloc
+peak) once, and the results go into a JSON file that later runs can be
+compared against:
+
+    python bench_profile.py run --out bench-baseline.json
+    python bench_profile.py compare bench-baseline.json --threshold 0.25
+
+The hand-rolled fast paths are also checked against the slow, obvious way
+of getting the same answer, on seeded random inputs (exit status 1 on any
+mismatch):
+
+    python bench_profile.py check
+
+Nothing touches the network beyond 127.0.0.1, and the updater's caches are
+pointed at a scratch directory so the real ones are left alone. Given a
+fixture file recorded with `update_profile.py --record`, the suite also
+times a whole update() replayed from it, in a scratch copy of the profile:
+
+    python bench_profile.py run --fixture profile-run.json.gz
+"""
+
+import argparse
+import contextlib
+import functools
+import http.server
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import secrets
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Callable, Dict, List, Tuple
+
+# The updater reads PROFILE_CACHE_DIR on import, so the scratch tree is named
+# here; only the commands that use it create it (see scratch()).
+SCRATCH = os.path.join(tempfile.gettempdir(), f"bench-profile-{os.getpid()}-{secrets.token_hex(4)}")
+os.environ["PROFILE_CACHE_DIR"] = os.path.join(SCRATCH, "cache")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+import update_profile as up  # noqa: E402  (needs PROFILE_CACHE_DIR set first)
+from contributions import ContributionStore  # noqa: E402
+
+SEED = 20240101
+
+
+@contextlib.contextmanager
+def scratch():
+    """SCRATCH, created for a with-block (by this process alone) and removed after it"""
+    os.mkdir(SCRATCH, 0o700)
+    try:
+        yield SCRATCH
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+def make_repos(count: int = 5000, languages: int = 60) -> List[Dict]:
+    """count repos as the GraphQL stream yields them, newest push first"""
+    rng = random.Random(SEED)
+    names = list(up.LANGUAGE_COLORS) + [f"Lang{i}" for i in range(languages - len(up.LANGUAGE_COLORS))]
+    # A long tail, like real usage: a few languages carry most of the bytes.
+    weights = [1 / (rank + 1) for rank in range(len(names))]
+    pushed = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    repos = []
+    for i in range(count):
+        pushed -= timedelta(minutes=rng.randint(1, 2000))
+        langs = set(rng.choices(names, weights, k=rng.randint(1, 6)))
+        repos.append({
+            "name": f"repo-{i}",
+            "description": f"synthetic repository {i}",
+            "primaryLanguage": {"name": next(iter(langs))},
+            "pushedAt": pushed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "updatedAt": pushed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "isPrivate": rng.random() < 0.2,
+            "isFork": rng.random() < 0.1,
+            "stargazerCount": rng.randint(0, 50),
+            "languages": [{"size": rng.randint(100, 2_000_000), "node": {"name": name}}
+                          for name in langs],
+        })
+    return repos
+
+
+def make_calendar(years: int = 10) -> List[Dict]:
+    """years of daily contribution counts, oldest first"""
+    rng = random.Random(SEED)
+    start = date(2026, 1, 1) - timedelta(days=365 * years)
+    return [{"date": (start + timedelta(days=i)).isoformat(),
+             "contributionCount": 0 if rng.random() < 0.3 else int(rng.expovariate(1 / 6))}
+            for i in range(365 * years)]
+
+
+def next_days(store: ContributionStore) -> List[Dict]:
+    """A fetch's worth of days for store: the provisional ones again, plus one new day"""
+    first = store.next_day()
+    return [{"date": (first + timedelta(days=i)).isoformat(), "contributionCount": 3}
+            for i in range(store.provisional + 1)]
+
+
+def make_feed(target_bytes: int = 20_000_000) -> bytes:
+    """An RSS document of about target_bytes, newest item first"""
+    published = datetime.now(timezone.utc)
+    body = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 60 + "</p>"
+    items, size, i = [], 0, 0
+    while size < target_bytes:
+        item = (f"<item><title>Post {i}</title><link>https://velog.io/@bench/post-{i}</link>"
+                f"<pubDate>{format_datetime(published - timedelta(days=i))}</pubDate>"
+                f"<description><![CDATA[{body}]]></description></item>")
+        items.append(item)
+        size += len(item)
+        i += 1
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            "<title>bench</title>" + "".join(items) + "</channel></rss>").encode("utf-8")
+
+
+def make_ring(n: int) -> List[Dict]:
+    """n segments, largest first, in seeded random colours (so usually unreadable as-is)"""
+    rng = random.Random(SEED + n)
+    return [{"name": f"Lang{i}", "color": f"#{rng.randrange(1 << 24):06x}",
+             "pct": 100 / n, "desc": "Development"} for i in range(n)]
+
+
+def make_readme(lines: int = 20_000) -> str:
+    """A long README with the updater's two marker regions in the middle"""
+    filler = "\n".join(f"Line {i} of a long profile README, with some **markdown** in it."
+                       for i in range(lines // 2))
+    return (f"{filler}\n<!-- AUTO-UPDATE:SHIPPING:START -->\nold\n<!-- AUTO-UPDATE:SHIPPING:END -->\n"
+            f"<!-- AUTO-UPDATE:WRITING:START -->\n<!-- AUTO-UPDATE:WRITING:END -->\n{filler}\n")
+
+
+class FeedServer:
+    """Serves one RSS document on 127.0.0.1, honouring If-None-Match"""
+
+    def __init__(self, feed: bytes):
+        etag = '"bench"'
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(feed)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(feed)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the reader stops once it has its posts
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/rss"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def replay_case(fixture: str) -> Tuple[Callable, Callable]:
+    """(setup, run) for a full update() answered from fixture, in a scratch profile tree.
+
+    setup forgets the build manifest, so every run renders every artifact.
+    """
+    tree = os.path.join(SCRATCH, "tree")
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+    os.makedirs(os.path.join(tree, "assets"), exist_ok=True)
+    for name in ("README.md", os.path.join("assets", "terminal-hero.svg")):
+        shutil.copy(os.path.join(root, name), os.path.join(tree, name))
+
+    def setup():
+        fixtures.replay(fixture)
+        up.github_client.cache_clear()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(up.BUILD_MANIFEST)
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(tree)
+        try:
+            up.update()
+        finally:
+            os.chdir(cwd)
+            fixtures.stop()
+
+    return setup, run
+
+
+def build_cases(fixture: str = None) -> Tuple[Dict[str, Tuple[Callable, Callable]], Callable]:
+    """name → (setup, run), plus a cleanup. setup runs untimed before every run.
+
+    Everything is built inside SCRATCH, which must exist.
+    """
+    print("🏗️  Building fixtures...")
+    repos = make_repos()
+    lang_stats = up.analyze_language_stats(repos)
+    segments = up.build_language_segments(lang_stats)
+    model = up.language_model(lang_stats, 4521, True, "2026-01-01")
+    days = make_calendar()
+    figures = up.hero_figures(days)
+    store = ContributionStore(os.path.join(SCRATCH, "contributions"))
+    store.extend(days)
+    readme = make_readme()
+    server = FeedServer(make_feed())
+    velog_cache = os.path.join(SCRATCH, "velog.json")
+    fetch = functools.partial(up.fetch_velog_writing, url=server.url, cache_path=velog_cache)
+
+    def forget_feed():
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(velog_cache)
+
+    def noop():
+        pass
+
+    cases = {
+        "analyze_language_stats[5000 repos]": (noop, lambda: up.analyze_language_stats(repos)),
+        "build_language_segments[60 langs]": (noop, lambda: up.build_language_segments(lang_stats)),
+    }
+    newcomers = [{"name": f"Lang{i}", "color": None, "pct": 20 - i, "desc": "Development"}
+                 for i in range(5)] + [{"name": "Others", "color": up.OTHERS_COLOR, "pct": 10, "desc": ""}]
+    cases["assign_hues[5 open, cold]"] = (up._pool_distances.cache_clear,
+                                          lambda: up.assign_hues(newcomers))
+    for n in range(6, 17, 2):
+        ring = make_ring(n)
+        cases[f"order_ring[{n}]"] = (noop, lambda ring=ring: up.order_ring(ring))
+    cases.update({
+        "render_language_donut": (noop, lambda: up.render_language_donut(
+            segments, 123.4, len(repos), "repos", "2026-01-01")),
+        "hero_figures[scan 10y]": (noop, lambda: up.hero_figures(days)),
+        "ContributionStore.figures[10y]": (noop, store.figures),
+        "ContributionStore.extend[+1 day]": (noop, lambda: store.extend(next_days(store))),
+        "render_hero_stats": (noop, lambda: up.render_hero_stats(figures)),
+        "language_donut[4 variants, one model]": (noop, lambda: [
+            up.language_donut(model, theme, size) for theme in up.THEMES for size in up.DONUT_SIZES]),
+        "render_project_card": (noop, lambda: up.render_project_card(
+            {"repo": "push-point", "cmd": "just dev"}, {field: repos[0].get(field) for field in up.CARD_FIELDS})),
+        "render_isocalendar[371 days]": (noop, lambda: up.render_isocalendar(days[-371:], figures)),
+        "update_readme_section[20k lines]": (noop, lambda: up.update_readme_section(
+            readme, "SHIPPING", "new line")),
+        "fetch_velog_writing[20 MB, cold]": (forget_feed, fetch),
+        "fetch_velog_writing[20 MB, 304]": (noop, fetch),
+    })
+    if fixture:
+        cases[f"update[replay {os.path.basename(fixture)}]"] = replay_case(fixture)
+    fetch()  # prime the validators for the 304 case
+
+    return cases, server.close
+
+
+def check_best_ring(trials: int = 400) -> List[str]:
+    """_best_ring() against trying every ring, on random rings of 3 to 7 segments.
+
+    The plain walk keeps the first permutation (segment 0 first) with the best
+    (worst colorblind seam, worst normal seam); _best_ring() promises that
+    very ring, not just one as good.
+    """
+    rng = random.Random(SEED)
+    failures = []
+    for trial in range(trials):
+        n = rng.randint(3, 7)
+        colors = [f"#{rng.randrange(1 << 24):06x}" for _ in range(n)]
+        cvd, normal = up._seam_matrix(colors)
+
+        def score(ring: Tuple[int, ...]) -> Tuple[float, float]:
+            return (min(cvd[ring[i]][ring[i - 1]] for i in range(n)),
+                    min(normal[ring[i]][ring[i - 1]] for i in range(n)))
+
+        brute = list(max(((0, *rest) for rest in itertools.permutations(range(1, n))), key=score))
+        fast = up._best_ring(cvd, normal)
+        if fast != brute:
+            failures.append(f"ring {trial} {colors}: {fast} {score(tuple(fast))} "
+                            f"!= {brute} {score(tuple(brute))}")
+    return failures
+
+
+def check_order_ring(trials: int = 300) -> List[str]:
+    """order_ring() against trying every ring, on random rings of 3 to 7 segments.
+
+    A ring that already clears both floors stays as it is. Any other goes to
+    the first permutation (segment 0 first) with the best (worst colorblind
+    seam up to CVD_FLOOR, worst normal seam), which is the natural order
+    itself whenever nothing beats it.
+    """
+    rng = random.Random(SEED)
+    failures = []
+    for trial in range(trials):
+        n = rng.randint(3, 7)
+        colors = [f"#{rng.randrange(1 << 24):06x}" for _ in range(n)]
+        cvd, normal = up._seam_matrix(colors)
+
+        def rank(ring: Tuple[int, ...]) -> Tuple[float, float]:
+            return (min(min(cvd[ring[i]][ring[i - 1]] for i in range(n)), up.CVD_FLOOR),
+                    min(normal[ring[i]][ring[i - 1]] for i in range(n)))
+
+        natural = tuple(range(n))
+        worst = up.ring_score(colors)
+        if worst[0] >= up.CVD_FLOOR and worst[1] >= up.NORMAL_FLOOR:
+            brute = list(natural)
+        else:
+            brute = list(max(((0, *rest) for rest in itertools.permutations(range(1, n))), key=rank))
+        fast = [s["index"] for s in up.order_ring([{"color": c, "index": i} for i, c in enumerate(colors)])]
+        if fast != brute:
+            failures.append(f"ring {trial} {colors}: {fast} {rank(tuple(fast))} "
+                            f"!= {brute} {rank(tuple(brute))}")
+    return failures
+
+
+def check_pick_hue(trials: int = 60) -> List[str]:
+    """_pick_hue() against scoring every pool hue under every ring order.
+
+    Random rings of 2 to 6 segments, some still uncolored, half of them also
+    drawn on a second surface that recolors one segment (as the light theme
+    recolors Others). The plain walk keeps, per hue and surface, the best
+    (worst colorblind seam up to CVD_FLOOR, worst normal seam) over all
+    orders, seams to uncolored segments left out, and picks the first hue
+    whose worst surface is best among those that clear the legend floor.
+    """
+    rng = random.Random(SEED)
+    pool, failures = up.hue_pool(), []
+    for trial in range(trials):
+        n = rng.randint(2, 6)
+        colors = [f"#{rng.randrange(1 << 24):06x}" if rng.random() < 0.7 else None for _ in range(n)]
+        slot = rng.randrange(n)
+        if rng.random() < 0.3:
+            colors[slot] = rng.choice(pool)  # a previous pick, which only seeds the search
+        recolors = [{}]
+        held = [c for j, c in enumerate(colors) if c and j != slot]
+        if held and rng.random() < 0.5:
+            recolors.append({rng.choice(held): f"#{rng.randrange(1 << 24):06x}"})
+
+        bests, closest = [], [float("inf")] * len(pool)
+        for recolor in recolors:
+            surface = [recolor.get(c, c) if c and j != slot else None for j, c in enumerate(colors)]
+            near = {j: up._pool_distances(c) for j, c in enumerate(surface) if c}
+            best = [(-float("inf"), -float("inf"))] * len(pool)
+            for rest in itertools.permutations(range(1, n)):
+                ring = (0, *rest)
+                const, cvd, normal = [(float("inf"), float("inf"))], [], []
+                for u, v in zip(ring, ring[1:] + ring[:1]):
+                    if u in near and v in near:
+                        const.append(up.seam_delta_e(surface[u], surface[v]))
+                    elif slot in (u, v) and (u if v == slot else v) in near:
+                        cvd.append(near[u if v == slot else v][0])
+                        normal.append(near[u if v == slot else v][1])
+                wc, wn = min([up.CVD_FLOOR] + [c for c, _ in const]), min(m for _, m in const)
+                scores = zip(map(min, up._columnwise_min(cvd, len(pool)), itertools.repeat(wc)),
+                             map(min, up._columnwise_min(normal, len(pool)), itertools.repeat(wn)))
+                best = list(map(max, best, scores))
+            bests.append(best)
+            closest = up._columnwise_min([closest] + [m for _, m in near.values()], len(pool))
+        best = list(map(min, *bests)) if len(bests) > 1 else bests[0]
+        floor = up.NORMAL_FLOOR
+        while max(closest) < floor:
+            floor /= 2
+        brute = pool[max((k for k in range(len(pool)) if closest[k] >= floor), key=best.__getitem__)]
+        fast = up._pick_hue(slot, colors, recolors)
+        if fast != brute:
+            failures.append(f"slot {slot} of {colors} {recolors[1:]}: {fast} {best[pool.index(fast)]} "
+                            f"!= {brute} {best[pool.index(brute)]}")
+    return failures
+
+
+def check_store_figures(stores: int = 60) -> List[str]:
+    """ContributionStore.figures() against hero_figures() over every day seen.
+
+    Each store is fed the way update() feeds it: a fetch from next_day() to a
+    newer day, revising the provisional tail as it goes, with an occasional
+    reopen from disk. After every fetch, its figures must match a plain scan
+    of the days it should now hold (the last revision of each one wins).
+    """
+    rng = random.Random(SEED)
+    failures = []
+    for trial in range(stores):
+        window, provisional = rng.randint(3, 40), rng.randint(1, 4)
+        path = os.path.join(SCRATCH, "figures", f"store-{trial}")
+        store = ContributionStore(path, window=window, provisional=provisional)
+        start = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+        history: List[int] = []
+        for fetch in range(rng.randint(1, 12)):
+            first = store.next_day() or start
+            kept = (first - start).days
+            counts = [rng.choice((0, 0, 1, 2, rng.randint(3, 50))) for _ in range(rng.randint(provisional, 60))]
+            store.extend({"date": (first + timedelta(days=i)).isoformat(), "contributionCount": c}
+                         for i, c in enumerate(counts))
+            history = history[:kept] + counts
+            if rng.random() < 0.3:
+                store = ContributionStore(path, window=window, provisional=provisional)
+
+            days = [{"date": (start + timedelta(days=i)).isoformat(), "contributionCount": c}
+                    for i, c in enumerate(history)]
+            fast, slow = store.figures(), up.hero_figures(days, window=window)
+            wrong = [k for k in slow if k != "avg" and fast[k] != slow[k]]
+            if abs(fast["avg"] - slow["avg"]) > 1e-9:
+                wrong.append("avg")
+            if wrong:
+                failures.append(f"store {trial} (window {window}, provisional {provisional}) "
+                                f"fetch {fetch}: " + ", ".join(f"{k} {fast[k]} != {slow[k]}" for k in wrong))
+                break
+    return failures
+
+
+# name → check; each returns a description of every mismatch it found.
+SELF_CHECKS = {
+    "_best_ring == every permutation [400 rings]": check_best_ring,
+    "order_ring == every permutation, colorblind capped [300 rings]": check_order_ring,
+    "_pick_hue == every hue under every ring [60 slots]": check_pick_hue,
+    "ContributionStore.figures() == hero_figures() [60 stores]": check_store_figures,
+}
+
+
+def run_checks() -> bool:
+    """Run every self-check; whether all of them passed"""
+    passed = True
+    for name, check in SELF_CHECKS.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            failures = check()
+        print(f"   {'✅' if not failures else '❌'} {name}")
+        for failure in failures[:5]:
+            print(f"      {failure}")
+        passed = passed and not failures
+    return passed
+
+
+def measure(setup: Callable, run: Callable, repeat: int) -> Dict[str, float]:
+    """Median and best wall time over repeat runs, then one traced run's peak"""
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            setup()
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        setup()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"median_s": statistics.median(timings), "min_s": min(timings),
+            "peak_kib": peak / 1024}
+
+
+def run_suite(repeat: int = 5, only: str = None, fixture: str = None) -> Dict:
+    """Run every case (or those whose name contains only) and collect the results"""
+    results = {}
+    with scratch():
+        cases, cleanup = build_cases(fixture)
+        try:
+            for name, (setup, run) in cases.items():
+                if only and only not in name:
+                    continue
+                results[name] = measure(setup, run, repeat)
+                r = results[name]
+                print(f"   {name:<38} {r['median_s'] * 1000:9.2f} ms  {r['peak_kib']:10.1f} KiB peak")
+        finally:
+            cleanup()
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Cases whose median time or peak memory grew by more than threshold"""
+    regressions = []
+    print(f"{'case':<38} {'time':>17} {'memory':>17}")
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<38} {'(new case)':>17}")
+            continue
+        cells = []
+        for key, unit, scale in (("median_s", "ms", 1000), ("peak_kib", "KiB", 1)):
+            ratio = new[key] / old[key] if old[key] else 1.0
+            flag = " ❌" if ratio > 1 + threshold else ""
+            if flag:
+                regressions.append(f"{name} {key}: {old[key] * scale:.2f} → {new[key] * scale:.2f} {unit}")
+            cells.append(f"{(ratio - 1) * 100:+7.1f}%{flag:<3}")
+        print(f"{name:<38} {cells[0]:>17} {cells[1]:>17}")
+    return regressions
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write its results")
+    run.add_argument("--out", default="bench-results.json", help="where to write the JSON results")
+    run.add_argument("--repeat", type=int, default=5, help="timed runs per case (median is kept)")
+    run.add_argument("--only", help="only cases whose name contains this")
+    run.add_argument("--fixture", help="also time a whole update replayed from this recording")
+
+    commands.add_parser("check", help="check the fast paths against brute force")
+
+    cmp = commands.add_parser("compare", help="flag regressions against a baseline")
+    cmp.add_argument("baseline", help="results JSON to compare against")
+    cmp.add_argument("current", nargs="?", help="results JSON to judge (default: run the suite now)")
+    cmp.add_argument("--threshold", type=float, default=0.25,
+                     help="allowed fractional growth before a case counts as regressed")
+    cmp.add_argument("--repeat", type=int, default=5, help="timed runs per case, when running now")
+    cmp.add_argument("--fixture", help="also time a replayed update, when running now")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        print("🔎 Checking fast paths against brute force...")
+        with scratch():
+            passed = run_checks()
+        if not passed:
+            sys.exit(1)
+        return
+
+    if args.command == "run":
+        print(f"⏱️  Running benchmarks ({args.repeat} runs per case)...")
+        results = run_suite(args.repeat, args.only, args.fixture)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.out}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        print(f"⏱️  Running benchmarks ({args.repeat} runs per case)...")
+        current = run_suite(args.repeat, fixture=args.fixture)
+    print()
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Make-style build graph for the generated profile artifacts.
+
+Each artifact names its output (a file, or one marker region of it), the
+inputs it is rendered from, and a render function. Inputs are fingerprinted
+into a manifest kept with the other caches; an artifact is only rendered
+when its fingerprint moved or its output file is no longer the one this
+graph last wrote. Whatever is rendered comes back as regions patches.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import Executor
+from typing import Callable, Dict, List
+
+import tracing
+from regions import Patch
+
+
+def fingerprint(value) -> str:
+    """Stable digest of a JSON-able value (dict order doesn't matter)"""
+    blob = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes, or None if it doesn't exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+class Artifact:
+    """One output of the graph.
+
+    path is the file written; region the marker region inside it, or None
+    for the whole file. inputs is everything the output depends on, as a
+    JSON-able dict — nothing else may leak into render, the clock included.
+    render returns the region's text or file's contents, or None to keep
+    what is there. offload marks a render worth sending to another process;
+    it must then be picklable (a module-level function or a partial of one).
+    needs is a prerequisite several artifacts share (the same object for
+    each), worked out once per build and only if one of them is stale;
+    render is called with its result. It must be picklable too, as it goes
+    to the executor whenever there is one; the renders that need it run
+    here, once it is back.
+    """
+
+    def __init__(self, name: str, path: str, inputs: Dict, render: Callable[..., str],
+                 region: str = None, offload: bool = False, needs: Callable[[], object] = None):
+        self.name, self.path, self.region = name, path, region
+        self.inputs, self.render, self.offload, self.needs = inputs, render, offload, needs
+        self.fingerprint = fingerprint(inputs)
+
+
+class BuildGraph:
+    """Artifacts plus the manifest of what each was last built from.
+
+    build() renders the stale artifacts and returns their patches; once
+    they have been written, record() stores the new fingerprints. The two
+    are split so a failed write never marks an artifact as built.
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.artifacts: List[Artifact] = []
+        self._built: List[Artifact] = []
+        self._stale: List[Artifact] = []
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def add(self, name: str, path: str, inputs: Dict, render: Callable[..., str],
+            region: str = None, offload: bool = False, needs: Callable[[], object] = None) -> Artifact:
+        artifact = Artifact(name, path, inputs, render, region, offload, needs)
+        self.artifacts.append(artifact)
+        return artifact
+
+    def stale(self) -> List[Artifact]:
+        """Artifacts whose inputs or output changed since they were last built"""
+        digests = {}
+        stale = []
+        for artifact in self.artifacts:
+            if artifact.path not in digests:
+                digests[artifact.path] = file_digest(artifact.path)
+            entry = self.manifest.get(artifact.name, {})
+            if (entry.get("inputs") != artifact.fingerprint
+                    or entry.get("output") != digests[artifact.path]):
+                stale.append(artifact)
+        return stale
+
+    def build(self, executor: Executor = None) -> Dict[str, Patch]:
+        """Render every stale artifact; its output as patches, by file.
+
+        Given an executor, the stale artifacts' prerequisites and offloadable
+        renders are all submitted to it first, and run alongside the rest.
+        """
+        stale = self._stale = self.stale()
+        print(f"🧱 Build graph: {len(stale)} of {len(self.artifacts)} artifacts stale"
+              + (f" ({', '.join(a.name for a in stale)})" if stale else ""))
+        patches: Dict[str, Patch] = {}
+        self._built = []
+        tracing.count("build.fresh", len(self.artifacts) - len(stale))
+        tracing.count("build.stale", len(stale))
+        needed, got = {}, {}
+        for a in stale:
+            if a.needs is not None and a.needs not in needed:
+                needed[a.needs] = executor.submit(a.needs) if executor is not None else None
+        pending = {a.name: executor.submit(a.render) for a in stale
+                   if executor is not None and a.offload and a.needs is None}
+        for artifact in stale:
+            with tracing.span(f"render:{artifact.name}"):
+                if artifact.needs is not None:
+                    if artifact.needs not in got:
+                        future = needed[artifact.needs]
+                        got[artifact.needs] = future.result() if future is not None else artifact.needs()
+                    text = artifact.render(got[artifact.needs])
+                elif artifact.name in pending:
+                    text = pending[artifact.name].result()
+                else:
+                    text = artifact.render()
+            if text is None:
+                continue
+            if artifact.region is None:
+                patches[artifact.path] = text
+            else:
+                patches.setdefault(artifact.path, {})[artifact.region] = text
+            self._built.append(artifact)
+        return patches
+
+    def record(self):
+        """Save the built artifacts' fingerprints against their outputs as written.
+
+        Every up-to-date artifact sharing a file with a built one gets the
+        file's new digest too, so writing one region doesn't make its
+        neighbours look stale next time. A stale artifact that rendered
+        nothing is left stale.
+        """
+        if not self._built:
+            return
+        built = {a.name for a in self._built}
+        unbuilt = {a.name for a in self._stale} - built
+        digests = {a.path: file_digest(a.path) for a in self._built}
+        for artifact in self.artifacts:
+            if artifact.path not in digests or artifact.name in unbuilt:
+                continue
+            if artifact.name in built:
+                self.manifest[artifact.name] = {"inputs": artifact.fingerprint}
+            self.manifest[artifact.name]["output"] = digests[artifact.path]
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            with open(self.manifest_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+        except OSError as e:
+            print(f"⚠️  Could not save build manifest ({e})")
@@ -0,0 +1,262 @@
+"""
+Append-only store of daily contribution counts.
+
+Counts live in a flat file of little-endian uint32s, one per day from the
+store's first date, and only ever grow at the end. Beside it, a small JSON
+file keeps the dates and the running aggregates. The aggregates cover all
+of history (total, best day, best streak) and a trailing window (total,
+best day, best streak). They are updated as each day is appended — O(1)
+amortised per day — so a run that adds one day never rescans the years
+before it.
+
+GitHub may still revise the last day or two of the calendar, so the most
+recent `provisional` days are kept in the JSON file rather than appended.
+They are fetched again next time and become final once they are older than
+that.
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from regions import write_atomic
+
+
+class _Window:
+    """Aggregates over the last `size` values of an append-only series.
+
+    total is a running sum; best day a monotonic deque of (index, count);
+    best streak a monotonic deque of finished runs of non-zero days,
+    (start, end) inclusive and longest first, plus the run the window's
+    start cuts through (edge) and the run still open at the end. A run
+    dropped from the deque for being no longer than a later one can never
+    be the longest again, since the later one stays in the window longer.
+    """
+
+    def __init__(self, size: int, state: Dict = None):
+        state = state or {}
+        self.size = size
+        self.total = state.get("total", 0)
+        self.peaks = deque(tuple(p) for p in state.get("peaks", []))
+        self.runs = deque(tuple(r) for r in state.get("runs", []))
+        self.edge = tuple(state["edge"]) if state.get("edge") else None
+
+    def state(self) -> Dict:
+        return {"total": self.total, "peaks": list(self.peaks), "runs": list(self.runs),
+                "edge": self.edge}
+
+    def push(self, index: int, count: int, dropped: int, run_ended: tuple):
+        """Value count arrived at index; dropped is the value that left (0 if none)"""
+        start = index - self.size + 1
+        self.total += count - dropped
+        while self.peaks and self.peaks[-1][1] <= count:
+            self.peaks.pop()
+        self.peaks.append((index, count))
+        while self.peaks[0][0] < start:
+            self.peaks.popleft()
+
+        if run_ended:
+            length = run_ended[1] - run_ended[0]
+            while self.runs and self.runs[-1][1] - self.runs[-1][0] <= length:
+                self.runs.pop()
+            self.runs.append(run_ended)
+        while self.runs and self.runs[0][0] < start:
+            self.edge = self.runs.popleft()
+        if self.edge and self.edge[1] < start:
+            self.edge = None
+
+    def best_day(self) -> int:
+        return self.peaks[0][1] if self.peaks else 0
+
+    def best_streak(self, end: int, open_from: int = None) -> int:
+        """Longest run inside the window ending at index end"""
+        start = max(0, end - self.size + 1)
+        best = self.runs[0][1] - self.runs[0][0] + 1 if self.runs else 0
+        if self.edge:
+            best = max(best, self.edge[1] - max(self.edge[0], start) + 1)
+        if open_from is not None:
+            best = max(best, end - max(open_from, start) + 1)
+        return best
+
+
+class ContributionStore:
+    """Daily counts for one account, under path + ".u32" / ".json".
+
+    window is the trailing span, in days, that figures() describes (the
+    provisional days included); provisional is how many of the newest days
+    stay revisable.
+    """
+
+    def __init__(self, path: str, window: int = 365, provisional: int = 2):
+        self.data_path, self.meta_path = path + ".u32", path + ".json"
+        self.window, self.provisional = window, provisional
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("window") != window or meta.get("provisional") != provisional:
+                meta = {}  # aggregates were kept for another window
+        except (OSError, ValueError):
+            meta = {}
+        self.start = date.fromisoformat(meta["start"]) if meta.get("start") else None
+        self.length = meta.get("length", 0)
+        self.tail = meta.get("tail", [])
+        self.all_time = meta.get("all_time", {"total": 0, "best_day": 0, "best_streak": 0})
+        self.open_from = meta.get("open_from")
+        self._window = _Window(window - provisional, meta.get("window_state"))
+
+        # Appends go data first, then meta; a crash in between leaves extra
+        # counts the meta never vouched for, so they are cut off here.
+        size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        if size < self.length * 4:
+            self._reset()
+        elif size > self.length * 4:
+            with open(self.data_path, "r+b") as f:
+                f.truncate(self.length * 4)
+
+    def _reset(self):
+        """Forget everything (the data file is shorter than the meta claims)"""
+        self.start, self.length, self.tail, self.open_from = None, 0, [], None
+        self.all_time = {"total": 0, "best_day": 0, "best_streak": 0}
+        self._window = _Window(self.window - self.provisional)
+        with open(self.data_path, "wb"):
+            pass
+
+    @property
+    def end(self) -> date:
+        """The newest final day, or None while empty"""
+        return self.start + timedelta(days=self.length - 1) if self.length else None
+
+    def next_day(self) -> date:
+        """The first day the store wants from the next fetch (None while empty)"""
+        return self.end + timedelta(days=1) if self.length else self.start
+
+    def counts(self, first: int = 0, stop: int = None) -> array:
+        """Final counts[first:stop] read straight from the data file"""
+        stop = self.length if stop is None else min(stop, self.length)
+        values = array("I")
+        if stop <= first:
+            return values
+        with open(self.data_path, "rb") as f:
+            if (stop - first) * 4 >= mmap.ALLOCATIONGRANULARITY:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    values.frombytes(mm[first * 4:stop * 4])
+            else:
+                f.seek(first * 4)
+                values.frombytes(f.read((stop - first) * 4))
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    def extend(self, days: Iterable[Dict]):
+        """Take a fetch's {date, contributionCount} days (oldest first, any overlap).
+
+        Days the store has already finalised are ignored and gaps count as
+        zero. The newest `provisional` days become the new tail; everything
+        older is appended and folded into the aggregates.
+        """
+        days = sorted(days, key=lambda d: d["date"])
+        if not days:
+            return
+        newest = date.fromisoformat(days[-1]["date"])
+        if self.start is None:
+            self.start = date.fromisoformat(days[0]["date"])
+        first = self.next_day()
+        counts = {d["date"]: d["contributionCount"] for d in days}
+        settle = newest - timedelta(days=self.provisional - 1)
+
+        fresh = array("I")
+        day = first
+        while day < settle:
+            fresh.append(counts.get(day.isoformat(), 0))
+            day += timedelta(days=1)
+        self.tail = []
+        while day <= newest:
+            self.tail.append(counts.get(day.isoformat(), 0))
+            day += timedelta(days=1)
+        if fresh:
+            self._append(fresh)
+        self._save()
+
+    def _append(self, fresh: array):
+        old = self.counts(max(0, self.length - self._window.size), self.length) \
+            if self.length else array("I")
+        window = self._window
+        for offset, count in enumerate(fresh):
+            index = self.length + offset
+            leaving = index - window.size
+            if leaving < 0:
+                dropped = 0
+            elif leaving >= self.length:
+                dropped = fresh[leaving - self.length]
+            else:
+                dropped = old[leaving - (self.length - len(old))]
+
+            run_ended = None
+            if count and self.open_from is None:
+                self.open_from = index
+            elif not count and self.open_from is not None:
+                run_ended, self.open_from = (self.open_from, index - 1), None
+            window.push(index, count, dropped, run_ended)
+
+            stats = self.all_time
+            stats["total"] += count
+            stats["best_day"] = max(stats["best_day"], count)
+            if self.open_from is not None:
+                stats["best_streak"] = max(stats["best_streak"], index - self.open_from + 1)
+
+        if sys.byteorder != "little":
+            fresh = array("I", fresh)
+            fresh.byteswap()
+        with open(self.data_path, "ab") as f:
+            f.write(fresh.tobytes())
+        self.length += len(fresh)
+
+    def _save(self):
+        meta = {"window": self.window, "provisional": self.provisional,
+                "start": self.start.isoformat() if self.start else None, "length": self.length,
+                "tail": self.tail, "all_time": self.all_time, "open_from": self.open_from,
+                "window_state": self._window.state()}
+        write_atomic(self.meta_path, json.dumps(meta).encode("utf-8"))
+
+    def series(self, days: int) -> List[int]:
+        """The newest days counts, provisional ones included, oldest first"""
+        final = max(0, days - len(self.tail))
+        return list(self.counts(max(0, self.length - final))) + self.tail[-days:]
+
+    def days(self, count: int) -> List[Dict]:
+        """The newest count days as {date, contributionCount}, oldest first"""
+        counts = self.series(count)
+        if not counts:
+            return []
+        first = self.start + timedelta(days=self.length + len(self.tail) - len(counts))
+        return [{"date": (first + timedelta(days=i)).isoformat(), "contributionCount": c}
+                for i, c in enumerate(counts)]
+
+    def figures(self, spark: int = 30) -> Dict:
+        """What the hero status bar shows, for the trailing window ending today.
+
+        total, best_day, best_streak (days) and avg over the window, covered
+        the days of it the store holds, and the newest spark days for the
+        sparkline. The final part comes from the aggregates; only the
+        provisional tail is walked.
+        """
+        end = self.length - 1
+        window = self._window
+        total = window.total + sum(self.tail)
+        best_day = max([window.best_day(), *self.tail])
+        best = window.best_streak(end, self.open_from) if self.length else 0
+
+        streak = end - max(self.open_from, end - window.size + 1) + 1 if self.open_from is not None else 0
+        for count in self.tail:
+            streak = streak + 1 if count else 0
+            best = max(best, streak)
+        covered = min(self.length, window.size) + len(self.tail)
+        return {"total": total, "best_day": best_day, "best_streak": best,
+                "current_streak": streak, "avg": total / max(covered, 1), "covered": covered,
+                "spark": self.series(spark)}
@@ -0,0 +1,188 @@
+"""
+Record/replay of the profile updater's network traffic.
+
+Off by default, and then every call goes straight through. record(path)
+captures each GitHub API exchange and each feed download as it happens;
+save() writes them to one gzipped JSON file. replay(path) serves them back
+from that file instead, and never opens a socket: a request the file
+doesn't have raises FixtureMissing rather than going to the network.
+
+An exchange is keyed by its source, method, URL (the path, for GitHub, so
+a recording made against a mock server replays against any host) and body.
+GraphQL variables that are timestamps are left out of the key, since they
+move with the clock. Answers to the same key are served in the order they
+were recorded, the last one again once they run out. Replay mirrors the
+recording exactly only when the caches start out the same, so record and
+replay with a scratch PROFILE_CACHE_DIR each (or the same warm one).
+"""
+
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from email.message import Message
+from typing import Callable, Dict, List, Tuple
+
+from regions import write_atomic
+
+FORMAT = 1
+
+_mode = None  # None, "record" or "replay"
+_path = None
+_lock = threading.Lock()
+_exchanges: Dict[str, List[Dict]] = {}
+_served: Dict[str, int] = {}
+
+
+class FixtureMissing(LookupError):
+    """Replay was asked for a request the fixture file never recorded"""
+
+
+def record(path: str):
+    """Start capturing exchanges, to be written to path by save()"""
+    global _mode, _path
+    with _lock:
+        _exchanges.clear()
+        _served.clear()
+        _mode, _path = "record", path
+
+
+def replay(path: str):
+    """Serve every exchange from path from now on"""
+    global _mode, _path
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        stored = json.load(f)
+    if stored.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a format {FORMAT} fixture file")
+    with _lock:
+        _exchanges.clear()
+        _exchanges.update(stored["exchanges"])
+        _served.clear()
+        _mode, _path = "replay", path
+
+
+def stop():
+    """Back to the network (anything recorded is dropped unless saved first)"""
+    global _mode, _path
+    with _lock:
+        _exchanges.clear()
+        _served.clear()
+        _mode = _path = None
+
+
+def replaying() -> bool:
+    return _mode == "replay"
+
+
+def save() -> int:
+    """Write what record() captured; the number of exchanges"""
+    with _lock:
+        if _mode != "record":
+            return 0
+        payload = json.dumps({"format": FORMAT, "exchanges": _exchanges},
+                             separators=(",", ":"), sort_keys=True).encode("utf-8")
+        count = sum(len(answers) for answers in _exchanges.values())
+    os.makedirs(os.path.dirname(_path) or ".", exist_ok=True)
+    write_atomic(_path, gzip.compress(payload, mtime=0))
+    return count
+
+
+def _is_timestamp(value) -> bool:
+    if not isinstance(value, str) or len(value) < 10:
+        return False
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except ValueError:
+        return False
+
+
+def _key(source: str, method: str, url: str, body: bytes) -> str:
+    text = (body or b"").decode("utf-8", errors="replace")
+    try:
+        request = json.loads(text)
+        variables = {name: value for name, value in (request.get("variables") or {}).items()
+                     if not _is_timestamp(value)}
+        text = json.dumps({**request, "variables": variables}, sort_keys=True)
+    except (ValueError, AttributeError):
+        pass
+    return f"{source} {method} {url} {text}"
+
+
+def _pack(status: int, headers: Dict[str, str], body: bytes) -> Dict:
+    try:
+        return {"status": status, "headers": headers, "text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"status": status, "headers": headers, "base64": base64.b64encode(body).decode()}
+
+
+def _unpack(answer: Dict) -> Tuple[int, Dict[str, str], bytes]:
+    body = (answer["text"].encode("utf-8") if "text" in answer
+            else base64.b64decode(answer["base64"]))
+    return answer["status"], dict(answer["headers"]), body
+
+
+def exchange(source: str, method: str, url: str, body: bytes,
+             live: Callable[[], Tuple[int, Dict[str, str], bytes]]) -> Tuple[int, Dict[str, str], bytes]:
+    """One request's (status, headers, body): live() as usual, captured, or replayed"""
+    if _mode is None:
+        return live()
+    key = _key(source, method, url, body)
+    if _mode == "replay":
+        with _lock:
+            answers = _exchanges.get(key)
+            if not answers:
+                raise FixtureMissing(f"no recorded answer for {source} {method} {url}")
+            index = _served.get(key, 0)
+            _served[key] = index + 1
+            return _unpack(answers[min(index, len(answers) - 1)])
+    status, headers, data = live()
+    with _lock:
+        _exchanges.setdefault(key, []).append(_pack(status, headers, data))
+    return status, headers, data
+
+
+def _message(headers: Dict[str, str]) -> Message:
+    message = Message()
+    for name, value in headers.items():
+        message[name] = value
+    return message
+
+
+class _Response(io.BytesIO):
+    """A whole downloaded body, standing in for an http.client.HTTPResponse"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        super().__init__(body)
+        self.url, self.status, self.headers = url, status, _message(headers)
+
+    def getcode(self) -> int:
+        return self.status
+
+
+def urlopen(request: urllib.request.Request, timeout: float):
+    """urllib.request.urlopen, through the fixture store when it is active.
+
+    Recording reads each body whole before handing it on, so a reader that
+    stops early still leaves a complete fixture.
+    """
+    if _mode is None:
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    def live():
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as resp:
+                return resp.status, dict(resp.headers.items()), resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers.items()), e.read()
+
+    url = request.full_url
+    status, headers, body = exchange("http", request.get_method(), url, request.data, live)
+    if status >= 300:
+        raise urllib.error.HTTPError(url, status, f"HTTP {status}", _message(headers), io.BytesIO(body))
+    return _Response(url, status, headers, body)
@@ -0,0 +1,344 @@
+"""
+Small GitHub GraphQL client for the profile updater.
+
+Keeps a pool of keep-alive HTTPS connections so a run's queries share TLS
+handshakes instead of forking the gh CLI once per call, and sends every
+request through a RateScheduler that keeps it inside GitHub's rate limits.
+Standard library only.
+"""
+
+import heapq
+import http.client
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from typing import Dict, Tuple
+
+import fixtures
+import tracing
+
+DEFAULT_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Request priorities, most urgent first. The scheduler admits waiting
+# requests in this order, and when the budget runs low only CRITICAL ones
+# (cheap and must-have, like the contribution calendar) still go out.
+CRITICAL, NORMAL, OPTIONAL = 0, 1, 2
+
+# Statuses worth another try after a pause: rate limits, and the gateway
+# errors GitHub's GraphQL endpoint gives under load.
+RETRY_STATUSES = {403, 429, 502, 503, 504}
+
+
+class GitHubError(RuntimeError):
+    """A GitHub request that failed, or answered with GraphQL errors"""
+
+
+class RateLimitedError(GitHubError):
+    """The rate budget won't allow this request before retry_at (epoch seconds)"""
+
+    def __init__(self, message: str, retry_at: float = None):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+class RateScheduler:
+    """Admission control between the fetch functions and the transport.
+
+    Tracks the remaining budget and its reset time from x-ratelimit-*
+    headers and GraphQL rateLimit { cost remaining resetAt } fields, and
+    the average cost of a query. Requests wait for a slot in priority
+    order; the number of slots grows by one after a run of clean answers
+    and halves on a rate-limit response (additive increase, multiplicative
+    decrease), between 1 and max_concurrency.
+
+    The last reserve points of the budget are kept back in tiers: OPTIONAL
+    requests stop at reserve, NORMAL ones at a quarter of it, and CRITICAL
+    ones run until it is gone. A request past its tier waits for the reset
+    if that is within max_wait seconds, and raises RateLimitedError if not;
+    so does a retry the server asks to put off for longer than that. clock,
+    sleep and rand can be swapped for deterministic ones.
+    """
+
+    def __init__(self, max_concurrency: int = 4, reserve: int = 200, max_wait: float = 60,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 60,
+                 clock=time.time, sleep=time.sleep, rand=random.random):
+        self.max_concurrency = self.limit = max(1, max_concurrency)
+        self.reserve, self.max_wait = reserve, max_wait
+        self.max_retries, self.base_delay, self.max_delay = max_retries, base_delay, max_delay
+        self.clock, self.sleep, self.rand = clock, sleep, rand
+        self.remaining = self.reset_at = None
+        self.cost = 1.0  # running average of a query's cost, in points
+        self.active = self._clean = 0
+        self._waiting = []  # heap of (priority, ticket)
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+
+    def resize(self, max_concurrency: int):
+        with self._cond:
+            self.max_concurrency = max(1, max_concurrency)
+            self.limit = min(self.limit, self.max_concurrency)
+            self._cond.notify_all()
+
+    def _hold(self, priority: int) -> float:
+        """Seconds this priority must wait for budget (0 if it may go now)"""
+        if self.remaining is None or self.reset_at is None:
+            return 0
+        floor = {CRITICAL: 0, NORMAL: self.reserve // 4}.get(priority, self.reserve)
+        if self.remaining - self.cost >= floor or (priority == CRITICAL and self.remaining > 0):
+            return 0
+        return max(0.0, self.reset_at - self.clock())
+
+    def acquire(self, priority: int = NORMAL):
+        """Block until a request of this priority may be sent"""
+        with self._cond:
+            entry = (priority, next(self._tickets))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry and self.active < self.limit:
+                        hold = self._hold(priority)
+                        if hold <= 0:
+                            break
+                        if hold > self.max_wait:
+                            raise RateLimitedError(
+                                f"GitHub rate budget low ({self.remaining} left); "
+                                f"resets in {hold:.0f}s", self.reset_at)
+                        tracing.count("ratelimit.held")
+                        self._cond.wait(hold)
+                        # The window has reset; assume a full budget until told otherwise.
+                        if self.reset_at is not None and self.clock() >= self.reset_at:
+                            self.remaining = self.reset_at = None
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            self.active += 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def observe(self, status: int, headers: Dict[str, str], limited: bool):
+        """Learn from one response's headers; adapt the concurrency"""
+        with self._cond:
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+            if "x-ratelimit-reset" in headers:
+                self.reset_at = float(headers["x-ratelimit-reset"])
+            if limited:
+                self.limit = max(1, self.limit // 2)
+                self._clean = 0
+                tracing.count("ratelimit.limited")
+            elif status < 400:
+                self._clean += 1
+                if self._clean >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._clean = 0
+            self._cond.notify_all()
+
+    def observe_cost(self, rate_limit: Dict):
+        """Learn from a GraphQL rateLimit { cost remaining resetAt } field"""
+        with self._cond:
+            if rate_limit.get("cost") is not None:
+                self.cost = 0.8 * self.cost + 0.2 * rate_limit["cost"]
+                tracing.count("ratelimit.cost", rate_limit["cost"])
+            if rate_limit.get("remaining") is not None:
+                self.remaining = rate_limit["remaining"]
+            if rate_limit.get("resetAt"):
+                self.reset_at = datetime.fromisoformat(
+                    rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+
+    def backoff(self, attempt: int, headers: Dict[str, str], priority: int = NORMAL) -> float:
+        """How long to wait before retry number attempt (from 0).
+
+        Retry-After wins when the server sends it; an exhausted primary
+        budget waits for its reset; anything else gets exponential backoff
+        with full jitter, so clients that failed together don't come back
+        together. Never more than max_wait: when the server's wait, or the
+        hold priority's tier is under, runs past that, RateLimitedError is
+        raised instead of sleeping through it.
+        """
+        if headers.get("retry-after"):
+            delay = float(headers["retry-after"])
+        elif headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            delay = max(0.0, float(headers["x-ratelimit-reset"]) - self.clock()) + 1
+        else:
+            delay = self.rand() * min(self.max_delay, self.base_delay * 2 ** attempt)
+            delay = min(delay, self.max_wait)
+        with self._cond:
+            wait = max(delay, self._hold(priority))
+        if wait > self.max_wait:
+            raise RateLimitedError(f"GitHub rate limited ({self.remaining} left); "
+                                   f"retry in {wait:.0f}s", self.clock() + wait)
+        return delay
+
+
+def _is_rate_limited(status: int, headers: Dict[str, str], body: bytes) -> bool:
+    """A 429, or a 403 that is a (primary or secondary) rate limit rather than a refusal"""
+    if status == 429:
+        return True
+    return status == 403 and (headers.get("x-ratelimit-remaining") == "0"
+                              or "retry-after" in headers or b"rate limit" in body.lower())
+
+
+class GitHubClient:
+    """GraphQL over pooled keep-alive connections to one endpoint.
+
+    The endpoint comes from graphql_url, else $GITHUB_GRAPHQL_URL (set by
+    Actions, and pointing at the right host on GitHub Enterprise), else
+    api.github.com — an http:// URL works too, for a local mock server. The
+    token comes from $GH_TOKEN or $GITHUB_TOKEN unless one is passed in.
+    Safe to share between threads: each request borrows its own connection,
+    and the scheduler (one is made if none is given) paces them all.
+    """
+
+    def __init__(self, token: str = None, graphql_url: str = None,
+                 pool_size: int = 4, timeout: float = 30, scheduler: RateScheduler = None):
+        url = graphql_url or os.environ.get("GITHUB_GRAPHQL_URL") or DEFAULT_GRAPHQL_URL
+        parts = urllib.parse.urlsplit(url)
+        self.scheme, self.host = parts.scheme, parts.netloc
+        self.path = parts.path or "/"
+        self.token = token or os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.scheduler = scheduler or RateScheduler(max_concurrency=pool_size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return cls(self.host, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method: str, path: str, body: bytes = None, headers: Dict[str, str] = None,
+                priority: int = NORMAL) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request when the scheduler allows it; (status, headers, body).
+
+        Rate limits (429, rate-limited 403s) and gateway errors are retried
+        up to the scheduler's max_retries, after its backoff; the last
+        answer is returned whatever it was. A retry that would have to wait
+        longer than the scheduler's max_wait raises RateLimitedError.
+        """
+        sched = self.scheduler
+        for attempt in itertools.count():
+            sched.acquire(priority)
+            try:
+                status, resp_headers, data = self._send(method, path, body, headers, priority)
+            finally:
+                sched.release()
+            limited = _is_rate_limited(status, resp_headers, data)
+            sched.observe(status, resp_headers, limited)
+            if (status not in RETRY_STATUSES or (status == 403 and not limited)
+                    or attempt >= sched.max_retries):
+                return status, resp_headers, data
+            delay = sched.backoff(attempt, resp_headers, priority)
+            tracing.count("http.backoff")
+            with tracing.span("backoff", status=status, seconds=delay):
+                sched.sleep(delay)
+
+    def _send(self, method: str, path: str, body: bytes, headers: Dict[str, str],
+              priority: int) -> Tuple[int, Dict[str, str], bytes]:
+        """One request, on the wire or through the fixture store (see fixtures.py)"""
+        return fixtures.exchange("github", method, path, body,
+                                 lambda: self._send_live(method, path, body, headers, priority))
+
+    def _send_live(self, method: str, path: str, body: bytes, headers: Dict[str, str],
+                   priority: int) -> Tuple[int, Dict[str, str], bytes]:
+        """One request on a pooled connection.
+
+        A kept-alive connection the server has since closed fails on first
+        use, so that one case is retried once on a fresh connection.
+        """
+        headers = {"User-Agent": "coldzero94-profile-updater", **(headers or {})}
+        if self.token:
+            headers["Authorization"] = f"bearer {self.token}"
+        with tracing.span("http", method=method, host=self.host, path=path, priority=priority) as span:
+            for attempt in (1, 2):
+                conn = self._connect()
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    if attempt == 2:
+                        raise
+                    tracing.count("http.retries")
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._release(conn)
+                span.set(status=resp.status, bytes=len(data), sent=len(body or b""))
+                return resp.status, {k.lower(): v for k, v in resp.getheaders()}, data
+
+    def graphql(self, query: str, variables: Dict = None, partial: bool = False,
+                priority: int = NORMAL) -> Dict:
+        """Run one GraphQL document and return its data.
+
+        GraphQL reports most failures inside a 200 response. They raise
+        GitHubError, unless partial is set and some data came back anyway —
+        then the fields that failed are simply null. An exhausted GraphQL
+        budget is one of those 200s (errors of type RATE_LIMITED), so it is
+        backed off and retried like a 429, raising RateLimitedError if that
+        would mean waiting past the scheduler's max_wait. A query that selects
+        rateLimit { cost remaining resetAt } keeps the scheduler's view of
+        the budget exact.
+        """
+        body = json.dumps({"query": query, "variables": variables or {}}).encode()
+        sched = self.scheduler
+        for attempt in itertools.count():
+            status, headers, raw = self.request("POST", self.path, body,
+                                                {"Content-Type": "application/json"}, priority)
+            if status != 200:
+                if _is_rate_limited(status, headers, raw):
+                    raise RateLimitedError(f"GraphQL request rate limited: HTTP {status}")
+                raise GitHubError(f"GraphQL request failed: HTTP {status} {raw[:200].decode(errors='replace')}")
+            payload = json.loads(raw)
+            errors = payload.get("errors")
+            if (errors and any(e.get("type") == "RATE_LIMITED" for e in errors)
+                    and attempt < sched.max_retries):
+                sched.observe(429, headers, True)
+                tracing.count("http.backoff")
+                sched.sleep(sched.backoff(attempt, headers, priority))
+                continue
+            if isinstance(payload.get("data"), dict) and payload["data"].get("rateLimit"):
+                sched.observe_cost(payload["data"]["rateLimit"])
+            if errors and not (partial and payload.get("data")):
+                message = "; ".join(e.get("message", str(e)) for e in errors)
+                if any(e.get("type") == "RATE_LIMITED" for e in errors):
+                    raise RateLimitedError(message)
+                raise GitHubError(message)
+            return payload["data"]
+
+    def resize(self, pool_size: int):
+        """Allow pool_size requests in flight, and keep as many idle connections"""
+        with self._idle.mutex:
+            self._idle.maxsize = pool_size
+        self.scheduler.resize(pool_size)
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Local GitHub stand-in for the profile updater
+Serves the GraphQL queries the updater makes, with GitHub's rate limiting
+
+Every login is a user with seeded synthetic repos and a contribution
+calendar. Responses carry realistic x-ratelimit-* headers and answer a
+rateLimit { cost remaining resetAt } selection. Queries are charged against a
+points budget that resets every window seconds. An exhausted budget answers
+like GitHub's GraphQL API (200, errors of type RATE_LIMITED, remaining 0).
+More than max_concurrent requests at once trips a secondary limit (403 with
+Retry-After). GET /rss/@<handle> serves a small velog-style feed with an
+ETag. Point the updater at it with:
+
+    python mock_github.py --port 8765 &
+    GITHUB_GRAPHQL_URL=http://127.0.0.1:8765/graphql GH_TOKEN=x python update_profile.py
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List
+
+LANGUAGES = ["Go", "Python", "TypeScript", "Kotlin", "Swift", "Rust", "Shell", "HTML", "C++", "Java"]
+
+
+def language_color(name: str) -> str:
+    """A stand-in for linguist's color for a language, stable per name"""
+    return "#" + hashlib.sha256(name.encode()).hexdigest()[:6]
+
+
+def make_repos(login: str, count: int) -> List[Dict]:
+    """login's repos, most recently pushed first, the same on every call"""
+    rng = random.Random(login)
+    pushed = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    repos = []
+    for i in range(count):
+        pushed -= timedelta(hours=rng.randint(1, 400))
+        stamp = pushed.strftime("%Y-%m-%dT%H:%M:%SZ")
+        langs = rng.sample(LANGUAGES, rng.randint(1, 4))
+        repos.append({
+            "name": f"{login}-repo-{i}", "description": f"repo {i} of {login}",
+            "primaryLanguage": {"name": langs[0], "color": language_color(langs[0])},
+            "updatedAt": stamp, "pushedAt": stamp,
+            "stargazerCount": rng.randint(0, 40), "isPrivate": rng.random() < 0.2,
+            "isFork": rng.random() < 0.1,
+            "languages": {"edges": [{"size": rng.randint(1_000, 900_000), "node": {"name": n}}
+                                    for n in langs]},
+        })
+    return repos
+
+
+def make_calendar(login: str, first: date, last: date) -> Dict:
+    """login's daily contributions first..last, in GitHub's weeks-of-days shape.
+
+    Each day's count depends only on the login and the date, so
+    overlapping ranges agree.
+    """
+    day, weeks, total, week = first, [], 0, []
+    while day <= last:
+        count = random.Random(f"{login}-{day}").choice([0, 0, 1, 2, 3, 5, 8, 13])
+        total += count
+        week.append({"date": day.isoformat(), "contributionCount": count})
+        if day.weekday() == 5:  # weeks run Sunday..Saturday
+            weeks.append({"contributionDays": week})
+            week = []
+        day += timedelta(days=1)
+    if week:
+        weeks.append({"contributionDays": week})
+    return {"contributionsCollection": {"contributionCalendar": {
+        "totalContributions": total, "weeks": weeks}}}
+
+
+def _day(value: str) -> date:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+
+class MockGitHub:
+    """The server, its synthetic world, and what it has seen.
+
+    budget points per window seconds; each query costs 1 plus 1 per 100
+    repository nodes asked for and 1 per 20 aliased repository lookups,
+    roughly how GitHub prices them. latency delays every answer.
+    """
+
+    def __init__(self, port: int = 0, repos: int = 150, budget: int = 5000, window: float = 3600,
+                 max_concurrent: int = 10, latency: float = 0.0, retry_after: int = 1):
+        self.repos_per_user, self.budget, self.window = repos, budget, window
+        self.max_concurrent, self.latency, self.retry_after = max_concurrent, latency, retry_after
+        self.lock = threading.Lock()
+        self.world: Dict[str, List[Dict]] = {}
+        self.deleted = set()  # repo names still listed but gone by lookup time
+        self.stats = {"requests": 0, "connections": 0, "in_flight": 0, "peak_in_flight": 0,
+                      "secondary_limited": 0, "primary_limited": 0, "points": 0}
+        self._window_start, self._used = time.time(), 0
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.graphql_url = self.url + "/graphql"
+
+    def start(self) -> "MockGitHub":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def repos(self, login: str) -> List[Dict]:
+        with self.lock:
+            if login not in self.world:
+                self.world[login] = make_repos(login, self.repos_per_user)
+            return self.world[login]
+
+    def _charge(self, cost: int) -> Dict:
+        """Spend cost points if the window has them; the rate-limit state either way"""
+        with self.lock:
+            now = time.time()
+            if now - self._window_start >= self.window:
+                self._window_start, self._used = now, 0
+            allowed = self._used + cost <= self.budget
+            if allowed:
+                self._used += cost
+                self.stats["points"] += cost
+            else:
+                self.stats["primary_limited"] += 1
+            reset = int(self._window_start + self.window)
+            return {"allowed": allowed, "cost": cost, "used": self._used,
+                    "remaining": self.budget - self._used, "reset": reset}
+
+    def _answer(self, query: str, variables: Dict) -> Dict:
+        """The payload for one query (the subset of the schema the updater uses).
+
+        A query GitHub would refuse comes back as {"errors": [...]} instead,
+        and a repository lookup that finds nothing (the login's repos, less
+        any in deleted) as a null alias plus a NOT_FOUND error, like GitHub.
+        """
+        data = {}
+        owner_match = re.search(r"repositoryOwner\(login: \$owner\)", query)
+        if owner_match:
+            repos = self.repos(variables["owner"])
+            size = int(re.search(r"repositories\(first: (\d+)", query).group(1))
+            start = int(variables.get("cursor") or 0)
+            with_languages = "languages(" in query.split("repositories(", 1)[1].split("user(login")[0]
+            nodes = [r if with_languages else {k: v for k, v in r.items() if k != "languages"}
+                     for r in repos[start:start + size]]
+            data["repositoryOwner"] = {"repositories": {
+                "nodes": nodes,
+                "pageInfo": {"hasNextPage": start + size < len(repos), "endCursor": str(start + size)}}}
+        if re.search(r"user\(login: \$owner\)", query) and (
+                "@include" not in query or variables.get("calendar")):
+            last = _day(variables["to"]) if variables.get("to") else date.today()
+            first = _day(variables["from"]) if variables.get("from") else last - timedelta(days=365)
+            if (last - first).days > 366:
+                return {"errors": [{"type": "INVALID_ARGUMENTS", "message":
+                                    "The total time spanned by 'from' and 'to' must not exceed 1 year"}]}
+            data["user"] = make_calendar(variables["owner"], first, last)
+        missing = []
+        for alias, owner, name in re.findall(
+                r'(r\d+): repository\(owner: "([^"]*)", name: "([^"]*)"\)', query):
+            repo = next((r for r in self.repos(owner) if r["name"] == name), None)
+            if repo is None or name in self.deleted:
+                missing.append({"type": "NOT_FOUND", "path": [alias],
+                                "message": f"Could not resolve to a Repository with the name '{owner}/{name}'."})
+                data[alias] = None
+            else:
+                data[alias] = {"languages": repo["languages"]}
+        return {"data": data, "errors": missing} if missing else {"data": data}
+
+    def _cost(self, query: str) -> int:
+        nodes = sum(int(n) for n in re.findall(r"repositories\(first: (\d+)", query))
+        lookups = len(re.findall(r"r\d+: repository\(", query))
+        return 1 + math.ceil(nodes / 100) + lookups // 20
+
+    def _handler(self):
+        mock = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with mock.lock:
+                    mock.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str]):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with mock.lock:
+                    mock.stats["requests"] += 1
+                    mock.stats["in_flight"] += 1
+                    mock.stats["peak_in_flight"] = max(mock.stats["peak_in_flight"],
+                                                       mock.stats["in_flight"])
+                    crowded = mock.stats["in_flight"] > mock.max_concurrent
+                    if crowded:
+                        mock.stats["secondary_limited"] += 1
+                try:
+                    time.sleep(mock.latency)
+                    if crowded:
+                        self._send(403, b'{"message": "You have exceeded a secondary rate limit. '
+                                        b'Please wait a few minutes before you try again."}',
+                                   {"Content-Type": "application/json",
+                                    "Retry-After": str(mock.retry_after)})
+                        return
+                    query, variables = body["query"], body.get("variables") or {}
+                    state = mock._charge(mock._cost(query))
+                    headers = {"Content-Type": "application/json",
+                               "X-RateLimit-Limit": str(mock.budget),
+                               "X-RateLimit-Remaining": str(state["remaining"]),
+                               "X-RateLimit-Used": str(state["used"]),
+                               "X-RateLimit-Reset": str(state["reset"]),
+                               "X-RateLimit-Resource": "graphql"}
+                    if not state["allowed"]:
+                        payload = {"errors": [{"type": "RATE_LIMITED",
+                                               "message": "API rate limit exceeded"}]}
+                    else:
+                        payload = mock._answer(query, variables)
+                        if "rateLimit {" in query and "data" in payload:
+                            reset = datetime.fromtimestamp(state["reset"], timezone.utc)
+                            payload["data"]["rateLimit"] = {
+                                "cost": state["cost"], "remaining": state["remaining"],
+                                "resetAt": reset.strftime("%Y-%m-%dT%H:%M:%SZ")}
+                    self._send(200, json.dumps(payload).encode(), headers)
+                finally:
+                    with mock.lock:
+                        mock.stats["in_flight"] -= 1
+
+            def do_GET(self):
+                handle = self.path.rsplit("@", 1)[-1]
+                published = datetime(2026, 9, 1, tzinfo=timezone.utc)
+                items = "".join(
+                    f"<item><title>{handle} post {i}</title>"
+                    f"<link>https://velog.io/@{handle}/post-{i}</link>"
+                    f"<pubDate>{format_datetime(published - timedelta(days=9 * i))}</pubDate></item>"
+                    for i in range(8))
+                feed = f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+                etag = '"' + hashlib.sha256(feed).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", {"ETag": etag})
+                else:
+                    self._send(200, feed, {"Content-Type": "application/rss+xml", "ETag": etag})
+
+        return Handler
+
+
+def main():
+    """Serve until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repos", type=int, default=150, help="repos per login")
+    parser.add_argument("--budget", type=int, default=5000, help="points per window")
+    parser.add_argument("--window", type=float, default=3600, help="seconds per rate-limit window")
+    parser.add_argument("--max-concurrent", type=int, default=10,
+                        help="requests in flight before the secondary limit trips")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every answer")
+    args = parser.parse_args()
+
+    mock = MockGitHub(args.port, args.repos, args.budget, args.window,
+                      args.max_concurrent, args.latency)
+    print(f"🧪 Mock GitHub at {mock.graphql_url} (velog feeds at {mock.url}/rss/@<handle>)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{json.dumps(mock.stats)}")
+
+
+if __name__ == "__main__":
+    main()
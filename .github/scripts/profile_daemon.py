@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Profile Daemon
+Keeps the profile updater running, warm, and commits what each change touches
+
+One long-lived process instead of a cold CI job per run. Each source —
+github (repos and contributions, one batched stream) and writing (the velog
+feed) — is polled on its own interval. A poll whose result fingerprints the
+same as last time ends there. A changed one rebuilds the artifact graph from
+the latest value of every source: only the artifacts whose inputs moved are
+rendered, and only the files they rewrote are committed.
+
+What the CI job pays for on every run stays warm here: the API client's
+connection pool, the palette and hue-pool tables, the build manifest, the
+language and contribution caches, and the last value of each source.
+
+GET /status on the status port answers with each source's polls and the
+last rebuild's timings, as JSON. To try it against the mock server and a
+throwaway clone:
+
+    python mock_github.py --port 8765 &
+    git clone . /tmp/profile && cd /tmp/profile
+    GITHUB_GRAPHQL_URL=http://127.0.0.1:8765/graphql GH_TOKEN=x \\
+        python .github/scripts/profile_daemon.py --github-every 30 --writing-every 60 \\
+        --velog-feed http://127.0.0.1:8765/rss/@coldzero
+    curl -s localhost:8766/status
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import update_profile as up
+from build import fingerprint
+
+# Seconds between polls of each source. Contributions move within the day;
+# the feed rarely does, and a 304 costs next to nothing anyway.
+DEFAULT_INTERVALS = {"github": 15 * 60, "writing": 60 * 60}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Source:
+    """One polled input: how to fetch it, how often, and what it last gave.
+
+    value is the last successful fetch (kept through failed ones, so a flaky
+    feed never blanks a section), digest its fingerprint.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], object], interval: float):
+        self.name, self.fetch, self.interval = name, fetch, interval
+        self.value = self.digest = None
+        self.next_due = 0.0
+        self.stats = {"interval_s": interval, "polls": 0, "changes": 0, "failures": 0,
+                      "last_poll": None, "last_change": None, "last_poll_s": None, "error": None}
+
+
+class ProfileDaemon:
+    """The sources, the artifact graph they feed, and the status server.
+
+    root is the checkout the artifacts are written into (and committed in,
+    unless commit is False). The caches and the build manifest live in the
+    cache directory under root, wherever the daemon was started from (an
+    absolute PROFILE_CACHE_DIR is used as is); manifest overrides the
+    manifest's path.
+    """
+
+    def __init__(self, root: str = ".", intervals: Dict[str, float] = None,
+                 velog_feed: str = up.VELOG_RSS, owner: str = up.OWNER,
+                 cards: List[Dict] = up.PROJECT_CARDS, manifest: str = None,
+                 commit: bool = True, push: bool = False, port: int = 8766):
+        intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        cache = os.path.join(root, up.CACHE_DIR)
+        self.root, self.owner, self.cards = root, owner, cards
+        self.manifest = manifest or os.path.join(cache, "build.json")
+        self.commit_changes, self.push = commit, push
+        list_repos = functools.partial(up.iter_repos_cached,
+                                       cache_path=os.path.join(cache, "languages.json"))
+        store = up.ContributionStore(os.path.join(cache, "contributions", owner))
+        up.palette_distances(cache)  # loaded once here, so renders never look for it in the cwd
+        card_repos = [card["repo"] for card in cards]
+        self.sources = {
+            "github": Source("github", functools.partial(
+                up.fetch_github, list_repos, owner, store, cards=card_repos), intervals["github"]),
+            "writing": Source("writing", functools.partial(
+                up.fetch_velog_writing, url=velog_feed, cache_path=os.path.join(cache, "velog.json")),
+                intervals["writing"]),
+        }
+        self.lock = threading.Lock()
+        self.started = _now()
+        self.last_run = None
+        self.runs = 0
+        self._stop = threading.Event()
+        self._serving = False
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def poll(self, source: Source) -> bool:
+        """Fetch one source; whether its value changed"""
+        started = time.monotonic()
+        try:
+            value = source.fetch()
+            error = None
+        except (Exception, SystemExit) as e:  # one bad poll mustn't end the daemon
+            value, error = None, repr(e)
+        elapsed = time.monotonic() - started
+        source.next_due = time.monotonic() + source.interval
+
+        changed = False
+        if error is None and value is not None:
+            digest = fingerprint(value)
+            changed = digest != source.digest
+            if changed:
+                source.value, source.digest = value, digest
+        with self.lock:
+            stats = source.stats
+            stats["polls"] += 1
+            stats["last_poll"], stats["last_poll_s"], stats["error"] = _now(), round(elapsed, 3), error
+            if error or value is None:
+                stats["failures"] += 1
+            if changed:
+                stats["changes"] += 1
+                stats["last_change"] = stats["last_poll"]
+        mark = "changed" if changed else ("failed: " + error if error else "unchanged")
+        print(f"🔄 {source.name} polled in {elapsed:.2f}s — {mark}")
+        return changed
+
+    def rebuild(self, trigger: List[str]) -> Dict:
+        """Render and write what the new values made stale, then commit it.
+
+        Returns (and keeps, for /status) the run's timings. Nothing happens
+        until github has answered at least once: it carries the summary every
+        artifact but the writing section is drawn from. A render or write
+        that fails (a marker file gone missing, say) is reported in the run,
+        and nothing is recorded, so the next rebuild tries it again.
+        """
+        github, writing = self.sources["github"].value, self.sources["writing"].value
+        run = {"at": _now(), "trigger": trigger, "changed": [], "commit": None}
+        if github is None:
+            print("⏳ No GitHub data yet; nothing to render")
+            return run
+
+        started = time.monotonic()
+        try:
+            graph = up.artifact_graph(github["summary"], github["contributions"], github["calendar"],
+                                      writing, owner=self.owner, root=self.root,
+                                      manifest=self.manifest, cards=self.cards)
+            patches = graph.build()
+            run["render_s"] = round(time.monotonic() - started, 3)
+
+            started = time.monotonic()
+            run["changed"] = up.write_patches(patches)
+            graph.record()
+            run["write_s"] = round(time.monotonic() - started, 3)
+        except (Exception, SystemExit) as e:  # write_patches exits on a missing file
+            run["error"] = repr(e)
+            print(f"⚠️  Rebuild failed ({e!r}); will try again on the next change")
+            return run
+
+        if run["changed"] and self.commit_changes:
+            started = time.monotonic()
+            paths = sorted({a.path for a in graph.artifacts
+                            if any(c == a.path or c.startswith(a.path + ":") for c in run["changed"])})
+            try:
+                run["commit"] = self.commit(paths, run["changed"])
+            except (OSError, subprocess.CalledProcessError) as e:
+                run["commit"] = f"failed: {e}"
+                print(f"⚠️  Could not commit ({e})")
+            run["commit_s"] = round(time.monotonic() - started, 3)
+        print(f"🗂️  Changed: {', '.join(run['changed']) if run['changed'] else 'nothing'}")
+        return run
+
+    def _git(self, *args: str) -> str:
+        return subprocess.run(["git", "-C", self.root, *args], check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def commit(self, paths: List[str], changed: List[str]) -> str:
+        """Commit exactly paths (whatever else is staged or dirty); the new HEAD"""
+        relative = [os.path.relpath(p, self.root) for p in paths]
+        self._git("add", "--", *relative)
+        message = ("🤖 Auto-update: " + ", ".join(os.path.relpath(c, self.root) for c in changed))
+        self._git("commit", "--quiet", "-m", message, "--", *relative)
+        head = self._git("rev-parse", "--short", "HEAD")
+        print(f"📌 Committed {len(relative)} file(s) as {head}")
+        if self.push:
+            self._git("push", "--quiet")
+            print("⬆️  Pushed")
+        return head
+
+    def run_once(self, everything: bool = False) -> bool:
+        """Poll the sources that are due (all of them, with everything), and
+        rebuild if any changed; whether one did"""
+        now = time.monotonic()
+        due = [s for s in self.sources.values() if everything or s.next_due <= now]
+        changed = [s.name for s in due if self.poll(s)]
+        if changed:
+            started = time.monotonic()
+            run = self.rebuild(changed)
+            run["fetch_s"] = {s.name: s.stats["last_poll_s"] for s in due}
+            run["total_s"] = round(time.monotonic() - started, 3)
+            with self.lock:
+                self.last_run = run
+                self.runs += 1
+        return bool(changed)
+
+    def serve_forever(self):
+        """Poll, rebuild and commit until stop() — answering /status meanwhile"""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self._serving = True
+        print(f"👀 Watching {', '.join(f'{n} every {s.interval:g}s' for n, s in self.sources.items())}"
+              f" — status at {self.url}/status")
+        while not self._stop.is_set():
+            self.run_once()
+            wait = min(s.next_due for s in self.sources.values()) - time.monotonic()
+            self._stop.wait(max(0.0, wait))
+        print("👋 Stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.stop()
+        if self._serving:
+            self.server.shutdown()
+        self.server.server_close()
+
+    def status(self) -> Dict:
+        """What /status answers"""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                "started": self.started, "runs": self.runs, "last_run": self.last_run,
+                "sources": {name: {**s.stats, "due_in_s": round(max(0.0, s.next_due - now), 1)}
+                            for name, s in self.sources.items()},
+            }
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.status(), indent=2).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    """Run until SIGINT/SIGTERM (or one round, with --once)"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", default=".", help="checkout to write and commit the artifacts in")
+    parser.add_argument("--github-every", type=float, default=DEFAULT_INTERVALS["github"],
+                        help="seconds between GitHub polls")
+    parser.add_argument("--writing-every", type=float, default=DEFAULT_INTERVALS["writing"],
+                        help="seconds between velog feed polls")
+    parser.add_argument("--velog-feed", default=up.VELOG_RSS, help="RSS feed for the writing section")
+    parser.add_argument("--port", type=int, default=8766, help="status endpoint port (0: any free one)")
+    parser.add_argument("--no-commit", action="store_true", help="write the artifacts but leave git alone")
+    parser.add_argument("--push", action="store_true", help="push after every commit")
+    parser.add_argument("--once", action="store_true", help="poll every source once, rebuild, and exit")
+    args = parser.parse_args()
+
+    daemon = ProfileDaemon(args.root, {"github": args.github_every, "writing": args.writing_every},
+                           velog_feed=args.velog_feed, commit=not args.no_commit, push=args.push,
+                           port=args.port)
+    if args.once:
+        daemon.run_once(everything=True)
+        print(json.dumps(daemon.status()["last_run"], indent=2))
+        daemon.close()
+        return
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    try:
+        daemon.serve_forever()
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
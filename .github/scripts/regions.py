@@ -0,0 +1,118 @@
+"""
+Marker-region patching for the generated profile files.
+
+A region is whatever sits between `<!-- NAME:START -->` and `<!-- NAME:END -->`
+(NAME may contain colons, as in AUTO-UPDATE:SHIPPING). Files are scanned once,
+as bytes, and only the regions whose contents actually change are spliced;
+a file is rewritten — atomically — only when at least one of them did.
+"""
+
+import mmap
+import os
+import re
+import tempfile
+from typing import Dict, List, Tuple, Union
+
+MARKER = re.compile(rb"<!-- ([A-Za-z0-9_:-]+):(START|END) -->")
+
+# Files at least this big are scanned through mmap rather than read whole.
+MMAP_THRESHOLD = 1 << 20
+
+# A patch for one file: a {region name: new text} map, or the whole new text.
+Patch = Union[Dict[str, str], str]
+
+
+def find_regions(buf) -> Dict[str, Tuple[int, int, bytes]]:
+    """Every complete region in buf: name → (body start, body end, END indent).
+
+    One pass over the markers, by byte offset; buf can be bytes or an mmap.
+    The indent is the whitespace that lines the END marker up with its file,
+    so a rewritten body leaves it where it was.
+    """
+    regions, opened = {}, {}
+    for marker in MARKER.finditer(buf):
+        name, edge = marker.group(1).decode(), marker.group(2)
+        if edge == b"START":
+            opened.setdefault(name, marker.end())
+        elif name in opened and name not in regions:
+            line_start = buf.rfind(b"\n", 0, marker.start()) + 1
+            indent = buf[line_start:marker.start()]
+            regions[name] = (opened[name], marker.start(), indent if not indent.strip() else b"")
+        elif name not in opened:
+            print(f"❌ Invalid markers for {name}")
+    return regions
+
+
+def region_body(text: str, indent: bytes = b"") -> bytes:
+    """What goes between the markers: text on its own lines, END re-indented"""
+    if not text.endswith("\n"):
+        text += "\n"
+    return b"\n" + text.encode("utf-8") + indent
+
+
+def splice(buf, updates: Dict[str, str]) -> Tuple[bytes, List[str]]:
+    """buf with the updated regions swapped in; (new bytes, changed region names).
+
+    Regions whose body would not change are left alone, and when none
+    change the returned bytes are buf's own.
+    """
+    regions = find_regions(buf)
+    edits = []
+    for name, text in updates.items():
+        if name not in regions:
+            print(f"⚠️  Markers for {name} not found")
+            continue
+        start, end, indent = regions[name]
+        body = region_body(text, indent)
+        if buf[start:end] != body:
+            edits.append((start, end, body, name))
+    if not edits:
+        return bytes(buf), []
+
+    pieces, copied = [], 0
+    for start, end, body, _ in sorted(edits):
+        pieces += (buf[copied:start], body)
+        copied = end
+    pieces.append(buf[copied:])
+    return b"".join(pieces), [name for *_, name in edits]
+
+
+def write_atomic(path: str, data: bytes):
+    """Replace path with data via a temp file and a rename, keeping its mode"""
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".",
+                                     prefix=".tmp-", delete=False) as f:
+        f.write(data)
+    os.chmod(f.name, mode)
+    os.replace(f.name, path)
+
+
+def patch_file(path: str, patch: Patch) -> List[str]:
+    """Apply one file's patch; the changed regions (or [path] for a whole file).
+
+    Big files are scanned through mmap, so finding the markers and comparing
+    the old bodies never needs the whole file as a Python string.
+    """
+    if isinstance(patch, str):
+        data = patch.encode("utf-8")
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == len(data) and f.read() == data:
+                    return []
+        except FileNotFoundError:
+            pass
+        write_atomic(path, data)
+        return [path]
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                data, changed = splice(buf, patch)
+        else:
+            data, changed = splice(f.read(), patch)
+    if changed:
+        write_atomic(path, data)
+    return [f"{path}:{name}" for name in changed]
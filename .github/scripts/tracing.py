@@ -0,0 +1,151 @@
+"""
+Timed spans and counters for the profile updater.
+
+Off by default. While disabled, span() hands back one shared no-op object
+and count() returns at once, so the instrumented code pays a function call
+and nothing else. enable() turns recording on. A run can then be written out
+as a Chrome trace (chrome://tracing or ui.perfetto.dev) and as a JSON
+summary of per-span totals and counters.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+_enabled = False
+_lock = threading.Lock()
+_events = []
+_counters = defaultdict(int)
+_threads = {}
+_origin = time.perf_counter()
+
+# How summary() treats span args. Measurements are summed per span name and
+# tallied labels counted per value; any other arg (a URL, a segment count, a
+# pool size) only labels its own span, in the trace.
+MEASURED = ("seconds", "bytes", "sent", "changed")
+TALLIED = ("status", "error", "priority")
+
+
+def enable():
+    """Start recording spans and counters (from a clean slate)"""
+    global _enabled, _origin
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _threads.clear()
+        _origin = time.perf_counter()
+        _enabled = True
+
+
+class _NullSpan:
+    """What span() returns while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    """One timed region; set() attaches numbers or labels to it as it runs"""
+
+    def __init__(self, name: str, args: Dict):
+        self.name, self.args = name, args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        thread = threading.current_thread()
+        with _lock:
+            tid = _threads.setdefault(thread.ident, (len(_threads) + 1, thread.name))[0]
+            _events.append({"name": self.name, "ph": "X", "pid": os.getpid(), "tid": tid,
+                            "ts": (self.start - _origin) * 1e6, "dur": (end - self.start) * 1e6,
+                            "args": self.args})
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+def span(name: str, **args):
+    """Time a with-block as a span called name, labelled with args"""
+    return _Span(name, args) if _enabled else _NULL
+
+
+def count(name: str, n: int = 1):
+    """Add n to the counter called name (cache hits, misses, retries, ...)"""
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+
+class _CountingReader:
+    """A file wrapper that adds every byte read to its span's bytes"""
+
+    def __init__(self, raw, into):
+        self.raw, self.into = raw, into
+        into.set(bytes=0)
+
+    def read(self, *args):
+        data = self.raw.read(*args)
+        self.into.args["bytes"] += len(data)
+        return data
+
+
+def counting(raw, into):
+    """raw, reporting the bytes read from it on the span into (raw itself when off)"""
+    return _CountingReader(raw, into) if _enabled and isinstance(into, _Span) else raw
+
+
+def summary() -> Dict:
+    """Per-span-name totals (calls, seconds, MEASURED args summed, TALLIED
+    args counted by value) and the counters"""
+    with _lock:
+        events, counters = list(_events), dict(_counters)
+    spans = {}
+    for event in events:
+        entry = spans.setdefault(event["name"], {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+        seconds = event["dur"] / 1e6
+        entry["calls"] += 1
+        entry["total_s"] += seconds
+        entry["max_s"] = max(entry["max_s"], seconds)
+        for key, value in event["args"].items():
+            if key in MEASURED:
+                entry[key] = entry.get(key, 0) + value
+            elif key in TALLIED:
+                tally = entry.setdefault(key, {})
+                tally[str(value)] = tally.get(str(value), 0) + 1
+    return {"spans": spans, "counters": counters}
+
+
+def write_chrome_trace(path: str):
+    """Write the recorded spans as Chrome trace event JSON"""
+    with _lock:
+        events = list(_events)
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": name}} for tid, name in _threads.values()]
+        counters = dict(_counters)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms",
+                   "otherData": {"counters": counters}}, f)
+
+
+def write_summary(path: str):
+    """Write summary() as JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary(), f, indent=2, sort_keys=True)
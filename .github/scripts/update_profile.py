@@ -4,18 +4,34 @@ Automatic GitHub Profile README Updater
 Analyzes all repositories and updates profile README with latest stats
 """
 
+import argparse
+import functools
+import hashlib
+import heapq
 import itertools
 import json
 import math
-import subprocess
+import os
 import sys
-import re
+import textwrap
+import threading
+import time
+import urllib.error
 import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
+from xml.sax.saxutils import escape
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import fixtures
+import regions
+from contributions import ContributionStore
+import tracing
+from build import BuildGraph, file_digest, fingerprint
+from github_api import (CRITICAL, NORMAL, OPTIONAL, GitHubClient, GitHubError, RateLimitedError,
+                        RateScheduler)
 
 # Donut colors. A language owns its hue, so a shuffle in the ranking never
 # repaints the ring — the reader who learned "Go is blue" stays right. Ring
@@ -31,9 +47,9 @@ from typing import Dict, List, Tuple
 #   the chroma floor on the Others gray, which is deliberate: Others is the
 #   de-emphasis color, not an identity hue.
 #
-# Nothing here needs hand-tending when a new language shows up. It claims a
-# spare hue, and order_ring() re-measures the ring and re-orders it if the
-# newcomer lands next to something it is too close to.
+# Nothing here needs hand-tending when a new language shows up. assign_hues()
+# picks it a hue from a generated pool — the one that leaves the best ring
+# the reserved hues allow — and order_ring() then settles where it sits.
 LANGUAGE_COLORS = {
     "Go": "#3987e5",          # blue
     "TypeScript": "#d95926",  # orange
@@ -41,7 +57,6 @@ LANGUAGE_COLORS = {
     "Kotlin": "#c98500",      # yellow
     "Swift": "#9085e9",       # violet
 }
-SPARE_COLORS = ["#d55181", "#008300", "#e66767"]  # magenta, green, red
 OTHERS_COLOR = "#6E7681"
 
 # OKLab ΔE ×100 floors, from the same skill: below these two neighbouring
@@ -49,6 +64,33 @@ OTHERS_COLOR = "#6E7681"
 # the second for everyone else.
 CVD_FLOOR, NORMAL_FLOOR = 6.0, 15.0
 
+# Where hues for unreserved languages come from: OKLCH colors every
+# POOL_HUE_STEP degrees round the wheel, at POOL_CHROMAS, across the
+# lightness band the reserved hues already span (so a newcomer neither glows
+# nor sinks next to them). Out-of-gamut ones are dropped.
+POOL_HUE_STEP = 2
+POOL_CHROMAS = (0.12, 0.15)
+POOL_LIGHTNESS_STEPS = 3
+
+# The surfaces the donut and hero are drawn for, one file each (the README
+# picks between them with <picture>). recolor swaps a segment color on that
+# surface; the ring is only re-validated where it does, since the seams are
+# all that order_ring() measures. Others goes lighter on white, where the
+# dark theme's gray reads as a real hue. greens are the sparkline's, lowest
+# first, and empty its no-contribution tick.
+THEMES = {
+    "dark": {"surface": "#0d1117", "border": "#30363d", "text": "#e6edf3", "muted": "#8b949e",
+             "faint": "#6e7681", "track": "#21262d", "empty": "#30363d",
+             "greens": ["#0e4429", "#006d32", "#26a641", "#39d353"], "recolor": {}},
+    "light": {"surface": "#ffffff", "border": "#d0d7de", "text": "#1f2328", "muted": "#656d76",
+              "faint": "#6e7781", "track": "#eaeef2", "empty": "#d0d7de",
+              "greens": ["#9be9a8", "#40c463", "#30a14e", "#216e39"],
+              "recolor": {"#6e7681": "#8c959f"}},
+}
+# Donut layouts: the full 840px card, and a 420px one (legend without the
+# descriptions) for narrow screens.
+DONUT_SIZES = ("full", "compact")
+
 # Machado, Oliveira & Fernandes (2009) at severity 1.0, on linear RGB. The
 # thresholds above are calibrated to this simulation, so it comes with them.
 MACHADO = {
@@ -60,6 +102,22 @@ MACHADO = {
                (-0.011820, 0.042940, 0.968881)),
 }
 
+# Whose profile this is, unless told otherwise (see batch_profiles.py).
+OWNER = "coldzero94"
+
+# The project cards under "Selected work", one assets/card-<repo>.svg each,
+# drawn from the owner's repo metadata. cmd is the optional one-liner shown
+# under the description (it isn't anywhere in the metadata).
+PROJECT_CARDS = [
+    {"repo": "push-point", "cmd": "just dev"},
+    {"repo": "cold-frame", "cmd": "brew install cold-frame"},
+    {"repo": "mindhit"},
+    {"repo": "lockwatcher"},
+]
+
+# Anything worth keeping between runs (never committed; see .gitignore).
+CACHE_DIR = os.environ.get("PROFILE_CACHE_DIR", ".cache/profile")
+
 LANG_DESCRIPTIONS = {
     'Python': 'AI/ML, FastAPI, Django',
     'TypeScript': 'Next.js, React, Node.js',
@@ -75,56 +133,311 @@ LANG_DESCRIPTIONS = {
 }
 
 
-def run_command(cmd: List[str]) -> str:
-    """Run shell command and return output"""
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {' '.join(cmd)}")
-        print(f"Error: {e.stderr}")
-        sys.exit(1)
+@functools.lru_cache(maxsize=None)
+def github_client() -> GitHubClient:
+    """The run's one API client, so every fetch shares its connection pool.
 
-
-def get_all_repos() -> List[Dict]:
-    """Fetch all repositories with language and update info"""
+    Replaying fixtures, its scheduler's clock reads forever-from-now: any
+    recorded rate-limit window has long reset, and backoffs are skipped
+    (however long they would have been, so the recorded retries replay).
+    """
+    if fixtures.replaying():
+        return GitHubClient(scheduler=RateScheduler(clock=lambda: math.inf, sleep=lambda seconds: None,
+                                                    max_wait=math.inf))
+    return GitHubClient()
+
+
+# Fields every ingestion path hands on, in the shape `gh repo list --json` uses
+# for them: languages is a list of {size, node: {name}} edges. The language
+# breakdown is the expensive part, so it can be left out of a listing and
+# filled in per repo (see iter_repos_cached).
+LANGUAGES_FIELD = ("languages(first: 100, orderBy: {field: SIZE, direction: DESC}) "
+                   "{ edges { size node { name } } }")
+LISTING_FIELDS = ("name description primaryLanguage { name color } updatedAt pushedAt "
+                  "stargazerCount isPrivate isFork")
+REPO_FIELDS = f"{LISTING_FIELDS} {LANGUAGES_FIELD}"
+# $from/$to may be null, which GitHub reads as "the past year"; a range can
+# span at most a year.
+CALENDAR_FIELD = ("contributionsCollection(from: $from, to: $to) { contributionCalendar { "
+                  "totalContributions weeks { contributionDays { date contributionCount } } } }")
+# Asked for alongside every query, so the client's scheduler knows the budget.
+RATE_LIMIT_FIELD = "rateLimit { cost remaining resetAt }"
+
+LANGUAGE_CACHE = os.path.join(CACHE_DIR, "languages.json")
+
+# Daily contribution history, per owner (see contributions.py), and how far
+# back a new one is filled in.
+CONTRIBUTIONS_DIR = os.path.join(CACHE_DIR, "contributions")
+BACKFILL_YEARS = 5
+
+VELOG_FEED = "https://v2.velog.io/rss/@{handle}"
+VELOG_RSS = VELOG_FEED.format(handle="coldzero")
+VELOG_CACHE = os.path.join(CACHE_DIR, "velog.json")
+
+# Input fingerprints of each generated artifact, as last written (see build.py).
+BUILD_MANIFEST = os.path.join(CACHE_DIR, "build.json")
+
+
+def get_all_repos(owner: str = OWNER, on_calendar: Callable = None,
+                  calendar_from: datetime = None) -> List[Dict]:
+    """Fetch all repositories with language and update info
+
+    Like `gh repo list --limit 100`: the first page only, as one list.
+    """
     print("🔍 Fetching all repositories...")
 
-    cmd = [
-        "gh", "repo", "list", "coldzero94",
-        "--limit", "100",
-        "--json", "name,description,primaryLanguage,languages,updatedAt,pushedAt,stargazerCount,isPrivate,isFork"
-    ]
-
-    output = run_command(cmd)
-    repos = json.loads(output)
+    repos = next(iter_repo_pages(owner, on_calendar=on_calendar, calendar_from=calendar_from))
 
     print(f"✅ Found {len(repos)} repositories")
     return repos
 
 
-def analyze_language_stats(repos: List[Dict]) -> Dict[str, int]:
-    """Aggregate language statistics across all repos"""
+def _calendar_days(user: Dict) -> List[Dict]:
+    """A user's contribution calendar flattened to days, oldest first"""
+    calendar = user["contributionsCollection"]["contributionCalendar"]
+    days = [d for w in calendar["weeks"] for d in w["contributionDays"]]
+    days.sort(key=lambda d: d["date"])
+    return days
+
+
+def iter_repo_pages(owner: str = OWNER, page_size: int = 100, fields: str = REPO_FIELDS,
+                    on_calendar: Callable = None, calendar_from: datetime = None) -> Iterator[List[Dict]]:
+    """Every repository of owner, one GraphQL page at a time, with no 100-repo cap.
+
+    Follows the connection's cursor and yields each page as it arrives, so
+    nothing downstream waits for — or holds — the whole list. Pages come in
+    the order `gh repo list` uses (most recently pushed first), which keeps
+    the aggregate identical to get_all_repos() whenever that one isn't capped.
+
+    With on_calendar, the first page's document also asks for owner's
+    contribution calendar, and hands its days (None for an org, which has
+    no calendar) to on_calendar — repos and calendar in one round trip.
+    The calendar covers calendar_from (at most a year back) to now, or the
+    past year if that is None. That first page is scheduled as CRITICAL;
+    the rest as NORMAL.
+    """
+    query = (
+        "query($owner: String!, $cursor: String, $calendar: Boolean!, "
+        "$from: DateTime, $to: DateTime) { "
+        "repositoryOwner(login: $owner) { "
+        f"repositories(first: {page_size}, after: $cursor, ownerAffiliations: OWNER, "
+        "orderBy: {field: PUSHED_AT, direction: DESC}) { "
+        f"pageInfo {{ hasNextPage endCursor }} nodes {{ {fields} }} }} }} "
+        f"user(login: $owner) @include(if: $calendar) {{ {CALENDAR_FIELD} }} {RATE_LIMIT_FIELD} }}"
+    )
+    cursor, pages = None, 0
+    while True:
+        calendar = bool(on_calendar) and not pages
+        variables = {"owner": owner, "cursor": cursor, "calendar": calendar, "from": None, "to": None}
+        if calendar and calendar_from:
+            variables.update(_calendar_range(calendar_from))
+        data = github_client().graphql(query, variables, partial=True,
+                                       priority=NORMAL if pages else CRITICAL)
+        if not data.get("repositoryOwner"):
+            raise GitHubError(f"Could not list repositories of {owner}")
+        if calendar:
+            on_calendar(_calendar_days(data["user"]) if data.get("user") else None)
+        page = data["repositoryOwner"]["repositories"]
+        pages += 1
+        for repo in page["nodes"]:
+            if "languages" in repo:
+                repo["languages"] = repo["languages"]["edges"]
+        yield page["nodes"]
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+    print(f"✅ Streamed {pages} page(s) of repositories")
+
+
+def iter_repos(owner: str = OWNER, page_size: int = 100, on_calendar: Callable = None,
+               calendar_from: datetime = None) -> Iterator[Dict]:
+    """Every repository of owner, languages included, as the pages arrive"""
+    print("🔍 Streaming all repositories...")
+    for page in iter_repo_pages(owner, page_size, on_calendar=on_calendar, calendar_from=calendar_from):
+        yield from page
+
+
+def fetch_languages(owner: str, names: List[str], batch: int = 50) -> Dict[str, List[Dict]]:
+    """Language edges for the named repos, many repos to a GraphQL query.
+
+    Each repo is an aliased field of the same document, so a day with a
+    handful of pushes costs one round trip however many repos changed.
+    These are OPTIONAL requests: when the rate budget runs low they raise
+    RateLimitedError rather than spend what the must-have queries need.
+    A repo deleted or renamed since it was listed comes back as None (GitHub
+    answers its alias with null and a NOT_FOUND error) rather than failing
+    the whole batch.
+    """
+    languages = {}
+    for start in range(0, len(names), batch):
+        chunk = names[start:start + batch]
+        fields = " ".join(
+            f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+            f"{{ {LANGUAGES_FIELD} }}"
+            for i, name in enumerate(chunk)
+        )
+        data = github_client().graphql(f"query {{ {fields} {RATE_LIMIT_FIELD} }}",
+                                       partial=True, priority=OPTIONAL)
+        for i, name in enumerate(chunk):
+            repo = data.get(f"r{i}")
+            languages[name] = repo["languages"]["edges"] if repo else None
+    return languages
+
+
+def iter_repos_cached(owner: str = OWNER, cache_path: str = LANGUAGE_CACHE, page_size: int = 100,
+                      on_calendar: Callable = None, calendar_from: datetime = None) -> Iterator[Dict]:
+    """Like iter_repos, but only asks for the language breakdowns that changed.
+
+    A repo's languages can only change when something is pushed to it, so
+    the cache keeps each repo's edges under its name and pushedAt. Pages are
+    listed without languages; a repo whose push timestamp moved, or that is
+    new, is looked up (batched per page), and every other one is served from
+    the cache. Forks are never looked up — their code isn't counted — and
+    the cache is rewritten with only the repos this listing returned, which
+    evicts deleted and newly forked ones. Hits and misses are reported at
+    the end of the stream.
+
+    If the lookups are rate limited, the rest of the stream makes do with
+    the breakdowns the cache already had (stale ones, under their old
+    pushedAt, so the next run looks them up again) instead of failing. A
+    repo that vanished between the listing and its lookup counts no
+    languages and is dropped from the cache.
+    """
+    print("🔍 Streaming all repositories (language cache)...")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    fresh, hits, misses, stale, gone = {}, 0, 0, 0, 0
+    limited = False
+    for page in iter_repo_pages(owner, page_size, LISTING_FIELDS, on_calendar, calendar_from):
+        changed = [
+            r["name"] for r in page
+            if not r.get("isFork")
+            and (r["name"] not in cache or cache[r["name"]]["pushedAt"] != r.get("pushedAt"))
+        ]
+        looked_up = {}
+        if changed and not limited:
+            try:
+                looked_up = fetch_languages(owner, changed)
+            except RateLimitedError as e:
+                limited = True
+                print(f"⚠️  Language lookups rate limited ({e}); using cached breakdowns")
+        changed = set(changed)
+        for repo in page:
+            if repo.get("isFork"):
+                repo["languages"] = []
+            elif repo["name"] in looked_up and looked_up[repo["name"]] is None:
+                gone += 1
+                repo["languages"] = []
+            elif repo["name"] in looked_up:
+                misses += 1
+                fresh[repo["name"]] = {"pushedAt": repo.get("pushedAt"),
+                                       "languages": looked_up[repo["name"]]}
+            elif repo["name"] in changed:
+                stale += 1
+                if repo["name"] in cache:
+                    fresh[repo["name"]] = cache[repo["name"]]
+            else:
+                hits += 1
+                fresh[repo["name"]] = cache[repo["name"]]
+            repo.setdefault("languages", fresh.get(repo["name"], {}).get("languages", []))
+            yield repo
+
+    evicted = len(set(cache) - set(fresh))
+    tracing.count("language_cache.hit", hits)
+    tracing.count("language_cache.miss", misses)
+    tracing.count("language_cache.evicted", evicted)
+    tracing.count("language_cache.stale", stale)
+    print(f"   language cache: {hits} hits, {misses} misses, {evicted} evicted "
+          f"— {misses} of {hits + misses + stale} breakdowns fetched"
+          + (f", {stale} left stale (rate limited)" if stale else "")
+          + (f", {gone} gone since listed" if gone else ""))
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(fresh, f)
+    except OSError as e:
+        print(f"⚠️  Could not save language cache ({e})")
+
+
+# What a project card shows of its repo (and so all that its build depends on).
+CARD_FIELDS = ("description", "primaryLanguage", "stargazerCount", "pushedAt")
+
+
+def _is_shipping(repo: Dict, owner: str = OWNER) -> bool:
+    """Whether a repo belongs in the recent-pushes line (the profile repo itself doesn't)"""
+    return (not repo.get("isPrivate") and not repo.get("isFork")
+            and repo.get("name") != owner and bool(repo.get("pushedAt")))
+
+
+def ingest_repos(repos: Iterable[Dict], push_limit: int = 3, owner: str = OWNER,
+                 cards: Iterable[str] = ()) -> Dict:
+    """Everything the renderers need from the repo list, in a single pass.
+
+    Language bytes are summed, forks skipped and the newest pushes kept as
+    each repo goes by, so a stream of thousands needs no more memory than the
+    per-language totals and push_limit repos. Returns lang_stats (largest
+    first, ties in first-seen order), repo_count, sees_private and updated
+    (the newest push among the counted repos, i.e. the date the totals are
+    as of) for the donut footer, recent for format_recent_pushes, cards
+    (the card fields of each repo named in cards that went by) and seen.
+    """
     print("📊 Analyzing language statistics...")
 
     language_totals = defaultdict(int)
+    counted = seen = 0
+    sees_private = False
+    updated = None
+    newest = []  # min-heap of (pushedAt, -position, repo): the push_limit newest
+    wanted, card_repos = set(cards), {}
+
+    for seen, repo in enumerate(repos, 1):
+        if repo.get("name") in wanted:
+            card_repos[repo["name"]] = {field: repo.get(field) for field in CARD_FIELDS}
+        if _is_shipping(repo, owner):
+            entry = (repo["pushedAt"], -seen, {"name": repo["name"], "pushedAt": repo["pushedAt"]})
+            if len(newest) < push_limit:
+                heapq.heappush(newest, entry)
+            elif entry > newest[0]:
+                heapq.heapreplace(newest, entry)
 
-    for repo in repos:
         if repo.get('isFork'):
             continue  # upstream code isn't ours
-        languages = repo.get('languages', [])
-        for lang in languages:
-            lang_name = lang['node']['name']
-            lang_size = lang['size']
-            language_totals[lang_name] += lang_size
+        # Count the repos the byte totals actually come from, for the footer.
+        counted += 1
+        # In Actions the default GITHUB_TOKEN is scoped to this repository, so
+        # the listing comes back public-only and the total is a slice of the
+        # real one. Note whether we saw anything private, so the footer can
+        # say which it is rather than claim a coverage we don't have.
+        sees_private = sees_private or bool(repo.get("isPrivate"))
+        if repo.get("pushedAt") and (updated is None or repo["pushedAt"] > updated):
+            updated = repo["pushedAt"]
+        for lang in repo.get('languages', []):
+            language_totals[lang['node']['name']] += lang['size']
 
     # Sort by size
     sorted_langs = dict(sorted(language_totals.items(), key=lambda x: x[1], reverse=True))
 
     total_size = sum(sorted_langs.values())
-    print(f"✅ Total code: {total_size / 1_000_000:.1f} MB")
+    print(f"✅ Total code: {total_size / 1_000_000:.1f} MB across {counted} of {seen} repos")
 
-    return sorted_langs
+    return {
+        "lang_stats": sorted_langs,
+        "repo_count": counted,
+        "sees_private": sees_private,
+        "updated": updated[:10] if updated else None,
+        "recent": [repo for _, _, repo in sorted(newest, reverse=True)],
+        "cards": card_repos,
+        "seen": seen,
+    }
+
+
+def analyze_language_stats(repos: Iterable[Dict]) -> Dict[str, int]:
+    """Aggregate language statistics across all repos"""
+    return ingest_repos(repos)["lang_stats"]
 
 
 def _oklab(hex_color: str, cvd: str = None) -> Tuple[float, float, float]:
@@ -152,6 +465,129 @@ def _delta_e(a: str, b: str, cvd: str = None) -> float:
     return 100 * math.dist(_oklab(a, cvd), _oklab(b, cvd))
 
 
+def _from_oklab(lab: Tuple[float, float, float]) -> str:
+    """Hex color at OKLab coordinates, or None outside the sRGB gamut"""
+    L, a, b = lab
+    l = (L + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m_ = (L - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s = (L - 0.0894841775 * a - 1.2914855480 * b) ** 3
+    linear = (
+        4.0767416621 * l - 3.3077115913 * m_ + 0.2309699292 * s,
+        -1.2684380046 * l + 2.6097574011 * m_ - 0.3413193965 * s,
+        -0.0041960863 * l - 0.7034186147 * m_ + 1.7076147010 * s,
+    )
+    if any(c < -1e-4 or c > 1 + 1e-4 for c in linear):
+        return None
+    srgb = [12.92 * c if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+            for c in (min(1.0, max(0.0, c)) for c in linear)]
+    return "#" + "".join(f"{round(c * 255):02x}" for c in srgb)
+
+
+@functools.lru_cache(maxsize=None)
+def hue_pool() -> Tuple[str, ...]:
+    """Every hue assign_hues() may hand out, darkest and least saturated first"""
+    band = [_oklab(c)[0] for c in LANGUAGE_COLORS.values()]
+    low, high = min(band), max(band)
+    steps = POOL_LIGHTNESS_STEPS - 1
+    pool = []
+    for i in range(POOL_LIGHTNESS_STEPS):
+        lightness = low + (high - low) * i / steps if steps else (low + high) / 2
+        for chroma in POOL_CHROMAS:
+            for degrees in range(0, 360, POOL_HUE_STEP):
+                h = math.radians(degrees)
+                color = _from_oklab((lightness, chroma * math.cos(h), chroma * math.sin(h)))
+                if color:
+                    pool.append(color)
+    return tuple(dict.fromkeys(pool))
+
+
+@functools.lru_cache(maxsize=None)
+def _pool_columns() -> Dict[str, Tuple[List[float], List[float], List[float]]]:
+    """The pool's OKLab coordinates per vision mode, one list per axis"""
+    pool = hue_pool()
+    return {mode or "normal": tuple(map(list, zip(*(_oklab(h, mode) for h in pool))))
+            for mode in (None, *MACHADO)}
+
+
+@functools.lru_cache(maxsize=256)
+def _pool_distances(color: str) -> Tuple[List[float], List[float]]:
+    """(colorblind, normal-vision) ΔE from color to every pool hue, as two lists.
+
+    One pass per vision mode down the pool's coordinate columns scores the
+    whole pool at once; the colorblind list keeps the worse of the modes, the
+    same way seam_delta_e() does for a single seam.
+    """
+    columns = _pool_columns()
+    by_mode = {}
+    for mode in ("normal", *MACHADO):
+        x, y, z = _oklab(color, None if mode == "normal" else mode)
+        ls, a_s, bs = columns[mode]
+        by_mode[mode] = [100 * math.hypot(l - x, a - y, b - z) for l, a, b in zip(ls, a_s, bs)]
+    return list(map(min, *(by_mode[k] for k in MACHADO))), by_mode["normal"]
+
+
+def palette_hues() -> List[str]:
+    """Every hue the donut can paint with, lower-cased, reserved ones first"""
+    hues = list(LANGUAGE_COLORS.values()) + [OTHERS_COLOR]
+    return list(dict.fromkeys(h.lower() for h in hues))
+
+
+_PALETTE = {}  # hue → index, plus the matrices, once loaded for this run
+
+
+def palette_distances(cache_dir: str = CACHE_DIR) -> Dict:
+    """ΔE between every two palette hues, for normal vision and each CVD mode.
+
+    The palette and the simulation matrices change far less often than the
+    script runs, so the matrix is kept on disk in cache_dir under a hash of
+    both and only rebuilt when one of them is edited. Each hue's OKLab
+    coordinates are worked out once per mode while building it, not once
+    per seam.
+    """
+    if _PALETTE:
+        return _PALETTE
+    hues = palette_hues()
+    key = hashlib.sha256(json.dumps([hues, MACHADO]).encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"palette-{key}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = None
+
+    if not cached or cached.get("hues") != hues:
+        tracing.count("palette_cache.miss")
+        cached = {"hues": hues}
+        for mode in (None, *MACHADO):
+            lab = [_oklab(h, mode) for h in hues]
+            cached[mode or "normal"] = [[100 * math.dist(a, b) for b in lab] for a in lab]
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(cached, f)
+        except OSError as e:
+            print(f"⚠️  Could not cache palette ΔE matrix ({e})")
+        print(f"   palette ΔE matrix rebuilt ({len(hues)} hues)")
+    else:
+        tracing.count("palette_cache.hit")
+
+    _PALETTE.update(cached, index={h: i for i, h in enumerate(hues)})
+    return _PALETTE
+
+
+def seam_delta_e(a: str, b: str) -> Tuple[float, float]:
+    """(colorblind, normal-vision) ΔE of one seam — worst CVD mode for the first.
+
+    Palette hues are looked up in the cached matrix; anything else (a color
+    passed in by hand) falls back to measuring it directly.
+    """
+    palette = palette_distances()
+    i, j = palette["index"].get(a.lower()), palette["index"].get(b.lower())
+    if i is None or j is None:
+        return min(_delta_e(a, b, k) for k in MACHADO), _delta_e(a, b)
+    return min(palette[k][i][j] for k in MACHADO), palette["normal"][i][j]
+
+
 def ring_score(colors: List[str]) -> Tuple[float, float]:
     """Worst (colorblind, normal-vision) separation across the ring's seams.
 
@@ -160,57 +596,406 @@ def ring_score(colors: List[str]) -> Tuple[float, float]:
     """
     if len(colors) < 2:
         return (99.0, 99.0)
-    seams = [(colors[i], colors[(i + 1) % len(colors)]) for i in range(len(colors))]
+    seams = [seam_delta_e(colors[i], colors[(i + 1) % len(colors)]) for i in range(len(colors))]
     return (
-        min(min(_delta_e(a, b, k) for k in MACHADO) for a, b in seams),
-        min(_delta_e(a, b) for a, b in seams),
+        min(cvd for cvd, _ in seams),
+        min(normal for _, normal in seams),
     )
 
 
+def _seam_matrix(colors: List[str]) -> Tuple[List[List[float]], List[List[float]]]:
+    """Pairwise (colorblind, normal-vision) ΔE between every two ring colors.
+
+    A seam's score never depends on where in the ring it sits, so one lookup
+    per pair up front is all the color math an ordering search needs.
+    """
+    n = len(colors)
+    cvd = [[0.0] * n for _ in range(n)]
+    normal = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            cvd[i][j], normal[i][j] = seam_delta_e(colors[i], colors[j])
+            cvd[j][i], normal[j][i] = cvd[i][j], normal[i][j]
+    return cvd, normal
+
+
+def _bits(mask: int):
+    """Indices of the set bits of mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@functools.lru_cache(maxsize=None)
+def _subset_masks(m: int) -> Tuple[int, ...]:
+    """Per element w of an m-set, a 2**m-bit mask of the subsets that contain w"""
+    masks = []
+    for w in range(m):
+        pattern, width = ((1 << (1 << w)) - 1) << (1 << w), 2 << w
+        while width < 1 << m:
+            pattern |= pattern << width
+            width *= 2
+        masks.append(pattern)
+    return tuple(masks)
+
+
+def _ring_cycle(adj: List[int]) -> List[int]:
+    """First ring through every segment using only the seams allowed by adj.
+
+    adj[i] is a bitmask of the segments i may sit next to. Segment 0 is pinned
+    to the front, so rotations never come up. paths[w] holds one bit per set S
+    of the other segments: set when some path leaves 0, covers exactly S and
+    stops at w. All sets are extended at once, as one shift of a big integer
+    per segment, so the table costs n sweeps rather than n! orderings. Read
+    back greedily, lowest index first, it gives the lexicographically first
+    ring — the one a plain permutation walk would stop at, which also keeps
+    mirror images out. Returns None when no such ring exists.
+    """
+    n = len(adj)
+    if n == 2:
+        return [0, 1] if adj[0] & 2 else None
+    if any(bin(a).count("1") < 2 for a in adj):
+        return None  # a segment with fewer than two allowed neighbours can't sit in a ring
+    # Segments 1..n-1 become elements 0..n-2 of the sets; 0 is always the start.
+    m, near = n - 1, [a >> 1 for a in adj]
+    contains = _subset_masks(m)
+    paths = [1 << (1 << w) if near[0] >> w & 1 else 0 for w in range(m)]
+    before = [list(_bits(near[w + 1])) for w in range(m)]
+    for _ in range(m - 1):
+        grown = False
+        for w in range(m):
+            reach = 0
+            for u in before[w]:
+                reach |= paths[u]
+            extended = paths[w] | (reach << (1 << w)) & contains[w]
+            grown |= extended != paths[w]
+            paths[w] = extended
+        if not grown:
+            break
+
+    def closes(w: int, rest: int) -> bool:
+        """Whether segment w can be followed by all of rest and then segment 0"""
+        if not rest:
+            return bool(adj[w + 1] & 1)
+        return any(paths[u] >> rest & 1 for u in _bits(near[w + 1] & rest))
+
+    ring, rest = [0], (1 << m) - 1
+    while rest:
+        for w in _bits(near[ring[-1]] & rest):
+            if closes(w, rest & ~(1 << w)):
+                ring.append(w + 1)
+                rest &= ~(1 << w)
+                break
+        else:
+            return None
+    return ring
+
+
+def _best_ring(cvd: List[List[float]], normal: List[List[float]]) -> List[int]:
+    """Ring order maximizing (worst colorblind seam, worst normal seam), exactly.
+
+    The objective is lexicographic, so it is settled one floor at a time: the
+    highest colorblind floor some ring can clear, then — among rings clearing
+    it — the highest normal-vision floor. Each floor is a binary search over
+    the distinct seam values, and each probe asks _ring_cycle() whether a ring
+    exists that uses only seams at or above it. The search window is narrow
+    in practice: the natural order clears its own worst seam, every ring
+    found clears its own, and no ring can beat any segment's second-best
+    seam, since every segment sits between two.
+    """
+    n = len(cvd)
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+    def ring_above(cvd_floor: float, normal_floor: float) -> List[int]:
+        adj = [0] * n
+        for i, j in pairs:
+            if cvd[i][j] >= cvd_floor and normal[i][j] >= normal_floor:
+                adj[i] |= 1 << j
+                adj[j] |= 1 << i
+        return _ring_cycle(adj)
+
+    def worst(ring: List[int], matrix: List[List[float]]) -> float:
+        return min(matrix[ring[i]][ring[i - 1]] for i in range(n))
+
+    def highest(matrix: List[List[float]], allowed, ring: List[int], probe) -> List[int]:
+        ceiling = min(sorted((matrix[i][j] for j in range(n) if j != i and allowed(i, j)),
+                             reverse=True)[1] for i in range(n))
+        levels = sorted({matrix[i][j] for i, j in pairs if allowed(i, j)})
+        lo, hi = levels.index(worst(ring, matrix)), levels.index(ceiling)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            found = probe(levels[mid])
+            if found is None:
+                hi = mid - 1
+            else:
+                ring, lo = found, levels.index(worst(found, matrix))
+        return ring
+
+    ring = highest(cvd, lambda i, j: True, list(range(n)),
+                   lambda t: ring_above(t, -math.inf))
+    cvd_best = worst(ring, cvd)
+    return highest(normal, lambda i, j: cvd[i][j] >= cvd_best, ring,
+                   lambda t: ring_above(cvd_best, t))
+
+
 def order_ring(segments: List[Dict]) -> List[Dict]:
     """Keep largest-first order while it is readable; re-order it when it is not.
 
     This is what keeps a new language from needing a hand re-validation: it is
     dropped in, the seams it creates get measured, and the ring gives up its
     natural order only when one of those seams is too close to call.
+
+    Rings rank by their worst colorblind seam counted up to CVD_FLOOR only,
+    as in assign_hues() — past it, a ring is better for clearing the
+    normal-vision floor too — then by their worst normal-vision seam. The
+    re-order is exact under that ranking: the ring a walk over every
+    permutation would keep (segment 0 first, the first of any tie), but found
+    by _best_ring() over the capped seam matrix rather than by trying every
+    permutation, so a top-15 ring costs milliseconds, not n!.
     """
     cvd, normal = ring_score([s["color"] for s in segments])
     if cvd >= CVD_FLOOR and normal >= NORMAL_FLOOR:
         print(f"   ring seams ok — worst ΔE {cvd:.1f} colorblind / {normal:.1f} normal")
         return segments
 
+    def rank(score: Tuple[float, float]) -> Tuple[float, float]:
+        return min(score[0], CVD_FLOOR), score[1]
+
     best, best_score = segments, (cvd, normal)
-    for candidate in itertools.permutations(segments):
+    if len(segments) > 3:  # three or fewer segments form one ring, whatever the order
+        with tracing.span("best_ring", segments=len(segments)):
+            cvd_seams, normal_seams = _seam_matrix([s["color"] for s in segments])
+            capped = [[min(d, CVD_FLOOR) for d in row] for row in cvd_seams]
+            candidate = [segments[i] for i in _best_ring(capped, normal_seams)]
         score = ring_score([s["color"] for s in candidate])
-        if score > best_score:
-            best, best_score = list(candidate), score
+        if rank(score) > rank(best_score):
+            best, best_score = candidate, score
 
     print(f"   ⚠️  ring re-ordered: worst ΔE {cvd:.1f}/{normal:.1f} "
           f"→ {best_score[0]:.1f}/{best_score[1]:.1f} (floors {CVD_FLOOR}/{NORMAL_FLOOR})")
     return best
 
 
+def _columnwise_min(columns: List[List[float]], size: int) -> List[float]:
+    """Element-wise minimum of equal-length lists (all infinite when there are none)"""
+    if len(columns) > 1:
+        return list(map(min, *columns))
+    return list(columns[0]) if columns else [math.inf] * size
+
+
+def _slot_scores(slot: int, n: int, seam: Callable[[int, int], float],
+                 columns: Dict[int, List[float]], floor: float = -math.inf) -> List[float]:
+    """Per candidate for the slot, the best floor a ring can clear with it
+    there — exact at or above floor; anything lower comes back as -inf.
+
+    seam(i, j) is the ΔE between two other segments (None when that seam is
+    off limits), and columns[j][k] the ΔE between candidate k and segment j
+    (-inf rules the candidate out). Whatever the candidate, the slot sits
+    between two other segments u and v, and the ring can only be as good as
+    those two seams and the best floor the rest of it clears from u round to
+    v. That floor is capped by each segment's best seam, and on the way round
+    by its second best. It is searched for with _ring_cycle() probes, the
+    slot's own seams pinned to u and v, galloping up from the lowest floor
+    that would still raise some candidate's score; a pair that can't raise
+    any is never probed.
+    """
+    others = [j for j in range(n) if j != slot]
+    table = {}
+    for i, j in itertools.combinations(others, 2):
+        value = seam(i, j)
+        if value is not None:
+            table[i, j] = table[j, i] = value
+    levels = sorted(set(table.values()))
+    ranked = {w: sorted((table.get((w, j), -math.inf) for j in others if j != w), reverse=True)
+              + [-math.inf] for w in others}
+    adjacency = {}
+
+    def ring_through(u: int, v: int, at: float) -> bool:
+        if at not in adjacency:
+            adj = [0] * n
+            for (i, j), value in table.items():
+                if value >= at:
+                    adj[i] |= 1 << j
+            adjacency[at] = adj
+        adj = list(adjacency[at])
+        adj[slot] = 1 << u | 1 << v
+        adj[u] |= 1 << slot
+        adj[v] |= 1 << slot
+        return _ring_cycle(adj) is not None
+
+    pairs = []
+    for u, v in itertools.combinations(others, 2):
+        reach = list(map(min, columns[u], columns[v]))
+        cap = min([ranked[u][0], ranked[v][0], *(ranked[w][1] for w in others if w not in (u, v))])
+        pairs.append((min(max(reach), cap), u, v, reach))
+    pairs.sort(key=lambda p: p[0], reverse=True)
+
+    score = [-math.inf] * len(columns[others[0]])
+    for bound, u, v, reach in pairs:
+        if bound < floor or bound == -math.inf:
+            break
+        raises = [(s, r) for s, r in zip(score, reach) if r > s and r >= floor]
+        if not raises:
+            continue
+        start = max(floor, min(s for s, _ in raises))
+        top = min(bound, max(r for _, r in raises))
+        if top < start or not ring_through(u, v, start):
+            continue
+        # Galloping, since most pairs clear little more than the start.
+        steps = [start] + [t for t in levels if start < t < top] + [top] * (top > start)
+        lo, hi, stride = 0, len(steps) - 1, 1  # steps[lo] is known to clear
+        while lo < hi:
+            mid = min(lo + stride, hi)
+            if ring_through(u, v, steps[mid]):
+                lo, stride = mid, stride * 2
+            else:
+                hi, stride = mid - 1, 1
+        score = list(map(max, score, map(min, reach, itertools.repeat(steps[lo]))))
+    return [s if s >= floor else -math.inf for s in score]
+
+
+def _pick_hue(slot: int, colors: List[str], recolors: Iterable[Dict[str, str]] = ({},)) -> str:
+    """The pool hue for colors[slot] that allows the best ring, the others held.
+
+    A candidate is scored by the best ring it allows, lexicographically —
+    worst colorblind seam, then worst normal-vision seam — without walking
+    ring orders: _slot_scores() settles the colorblind floor for every
+    candidate at once, then the normal-vision floor for the ones tied on it,
+    keeping to seams that clear the first. Ties go to the earlier pool hue.
+    recolors are the themes' recolor maps: each one that changes a held
+    color is a surface the ring is re-ordered for, and a candidate counts
+    with its worst surface. A candidate must also clear the normal-vision
+    floor against every other segment, on every surface, so the legend never
+    shows two near-identical swatches; when none can, that floor is halved
+    until some candidate clears it.
+    Unfilled slots (colors[j] is None) are left out of the score. The slot's
+    current color, if any, only seeds the search.
+    """
+    n, size = len(colors), len(hue_pool())
+    surfaces = list(dict.fromkeys(tuple(recolor.get(c.lower(), c).lower() if c and j != slot else None
+                                        for j, c in enumerate(colors)) for recolor in recolors))
+    near, seams = [], []
+    for held in surfaces:
+        near.append({j: _pool_distances(c) for j, c in enumerate(held) if c})
+        seams.append({})
+        for i, j in itertools.combinations(sorted(near[-1]), 2):
+            seams[-1][i, j] = seams[-1][j, i] = seam_delta_e(held[i], held[j])
+
+    closest = _columnwise_min([normal for surface in near for _, normal in surface.values()], size)
+    floor = NORMAL_FLOOR
+    while max(closest) < floor:
+        floor /= 2
+    candidates = [k for k in range(size) if closest[k] >= floor]
+
+    if n < 3:  # no ring to search: the slot touches whatever else there is
+        return hue_pool()[max(candidates, key=lambda k: min(
+            (min([CVD_FLOOR, *(d[0][k] for d in surface.values())]),
+             min((d[1][k] for d in surface.values()), default=math.inf)) for surface in near))]
+
+    # Columns run over the candidates that clear the legend floor, in pool
+    # order. Colorblind ΔE only counts up to CVD_FLOOR: once a ring clears
+    # it, normal-vision separation is what is left to win.
+    others = [j for j in range(n) if j != slot]
+    open_seam = (math.inf, math.inf)
+    cvd = [{j: [min(surface[j][0][k], CVD_FLOOR) for k in candidates] if j in surface
+            else [CVD_FLOOR] * len(candidates) for j in others} for surface in near]
+    normal = [{j: [surface[j][1][k] for k in candidates] if j in surface
+               else [math.inf] * len(candidates) for j in others} for surface in near]
+    current = candidates.index(hue_pool().index(colors[slot])) \
+        if colors[slot] in hue_pool() and hue_pool().index(colors[slot]) in candidates else None
+
+    def settle(columns: List[Dict[int, List[float]]], seam: Callable[[int, int, int], float],
+               keep: List[int], counts: Callable[[int, int], bool]) -> Tuple[List[float], List[List[float]]]:
+        """Per candidate in keep, its worst score over the surfaces that
+        counts(surface, candidate) lets count, and every surface's scores"""
+        def scores(subset: List[int], at_least: float) -> List[List[float]]:
+            return [_slot_scores(slot, n, functools.partial(seam, s),
+                                 {j: [column[t] for t in subset] for j, column in columns[s].items()},
+                                 at_least) for s in range(len(surfaces))]
+
+        def worst(by_surface: List[List[float]], subset: List[int]) -> List[float]:
+            return _columnwise_min([[score if counts(s, t) else math.inf for score, t in zip(scores, subset)]
+                                    for s, scores in enumerate(by_surface)], len(subset))
+
+        # Any one candidate's own score is a floor the best one must reach;
+        # the current color (or the one furthest from its neighbours) is a good bet.
+        nearest = _columnwise_min([column for surface in columns for column in surface.values()], len(candidates))
+        seed = current if current in keep else max(keep, key=nearest.__getitem__)
+        at_least = worst(scores([seed], -math.inf), [seed])[0]
+        by_surface = scores(keep, at_least)
+        return worst(by_surface, keep), by_surface
+
+    cvd_worst, cvd_by_surface = settle(
+        cvd, lambda s, i, j: min(seams[s].get((i, j), open_seam)[0], CVD_FLOOR),
+        list(range(len(candidates))), lambda s, t: True)
+    cvd_best = max(cvd_worst)
+    tied = [t for t, w in enumerate(cvd_worst) if w == cvd_best]
+    if len(tied) > 1:
+        # Among these, normal vision decides — through seams that clear the
+        # colorblind floor, on the surfaces where that floor is just reached.
+        cleared = [{j: [m if c >= cvd_best else -math.inf for m, c in zip(normal[s][j], cvd[s][j])]
+                    for j in others} for s in range(len(surfaces))]
+        normal_worst, _ = settle(
+            cleared, lambda s, i, j: seams[s].get((i, j), open_seam)[1]
+            if seams[s].get((i, j), open_seam)[0] >= cvd_best else None,
+            tied, lambda s, t: cvd_by_surface[s][t] == cvd_best)
+        tied = [tied[normal_worst.index(max(normal_worst))]]
+    return hue_pool()[candidates[tied[0]]]
+
+
+def assign_hues(segments: List[Dict], rounds: int = 4) -> List[Dict]:
+    """Give every segment without a color one from hue_pool(); the rest keep theirs.
+
+    The choice is made for the ring, not the swatch: what is maximized is the
+    (worst colorblind seam, worst normal seam) of the best ring order the
+    colors allow, over every order of the segments, for every candidate (see
+    _pick_hue for how that avoids walking the orders). Every theme's recolor
+    of the held segments counts, each with its own best order, and a pick is
+    only as good as its worst theme — so the light donut clears the floors
+    too, not just the dark one it was picked on. The open segments are
+    filled largest first, each against the ones already colored, then
+    revisited in turn until none would change — coordinate ascent, so a later
+    pick can move an earlier one. The result is a function of which languages
+    are in the ring, so it holds still from run to run as long as the
+    ranking's membership does.
+    """
+    open_slots = [i for i, s in enumerate(segments) if not s.get("color")]
+    if not open_slots:
+        return segments
+    colors = [s.get("color") for s in segments]
+    recolors = [theme["recolor"] for theme in THEMES.values()]
+    with tracing.span("assign_hues", open=len(open_slots), pool=len(hue_pool())):
+        for _ in range(rounds):
+            changed = False
+            for slot in open_slots:
+                pick = _pick_hue(slot, colors, recolors)
+                changed |= pick != colors[slot]
+                colors[slot] = pick
+            if not changed:
+                break
+    picked = ", ".join(f"{segments[i]['name']} {colors[i]}" for i in open_slots)
+    print(f"   🎨 {picked} (from {len(hue_pool())} pool hues)")
+    return [{**s, "color": c} for s, c in zip(segments, colors)]
+
+
 def build_language_segments(lang_stats: Dict[str, int]) -> List[Dict]:
     """Top 5 languages + Others, largest first, each with its own color.
 
-    Position follows size, which is what a reader expects; the hue follows the
-    language, so a shuffle in the ranking moves a segment without repainting it.
+    Position follows size, which is what a reader expects; a reserved hue
+    follows the language, so a shuffle in the ranking moves a segment without
+    repainting it. Languages without one get theirs from assign_hues().
     """
     total = sum(lang_stats.values())
     if not total:
         return []
 
     top = dict(list(lang_stats.items())[:5])
-    # A language nobody reserved a hue for claims a spare one — starting with
-    # the hue freed by whichever reserved language it displaced.
-    spares = [c for name, c in LANGUAGE_COLORS.items() if name not in top] + SPARE_COLORS
-
     segments = []
     for name, size in top.items():
-        color = LANGUAGE_COLORS.get(name) or (spares.pop(0) if spares else OTHERS_COLOR)
         segments.append({
             "name": name,
-            "color": color,
+            "color": LANGUAGE_COLORS.get(name),  # None until assign_hues() picks one
             "pct": size / total * 100,
             "desc": LANG_DESCRIPTIONS.get(name, "Development"),
         })
@@ -226,11 +1011,12 @@ def build_language_segments(lang_stats: Dict[str, int]) -> List[Dict]:
             "desc": f"{named}, +{len(tail) - 3} more" if len(tail) > 3 else named,
         })
 
-    return order_ring(segments)
+    return order_ring(assign_hues(segments))
 
 
-def render_language_donut(segments: List[Dict], total_mb: float,
-                          repo_count: int, scope: str) -> str:
+def render_language_donut(segments: List[Dict], total_mb: float, repo_count: int,
+                          scope: str, updated: str, owner: str = OWNER,
+                          theme: Dict = THEMES["dark"], size: str = "full") -> str:
     """Donut + legend as a standalone SVG.
 
     The hole holds the headline the chart is actually making — which language
@@ -238,8 +1024,17 @@ def render_language_donut(segments: List[Dict], total_mb: float,
     and not about the work. The ring is the at-a-glance part-to-whole; the
     exact share is never left to the eye, since every segment is
     direct-labelled in the legend beside it.
+
+    updated is the footer's date (YYYY-MM-DD). It is passed in rather than
+    read off the clock, so the same totals always render the same file.
+    theme is a THEMES entry, whose segments are already in its colors and
+    order (see themed_segments); a compact size drops the descriptions and
+    most of the footer to fit half the width.
     """
-    cx, cy, r, width = 132, 125, 66, 22
+    compact = size == "compact"
+    view_w = 420 if compact else 840
+    cx, cy, r, width = (110 if compact else 132), 125, 66, 22
+    legend_x = 214 if compact else 272
     circumference = 2 * math.pi * r
     gap = 3.0  # surface gap between segments, not a border around them
 
@@ -258,11 +1053,13 @@ def render_language_donut(segments: List[Dict], total_mb: float,
     for i, seg in enumerate(segments):
         y = 42 + i * 32
         rows.append(
-            f'  <rect x="272" y="{y - 10}" width="12" height="12" rx="3" fill="{seg["color"]}"/>\n'
-            f'  <text class="name" x="294" y="{y}">{seg["name"]}</text>\n'
-            f'  <text class="pct" x="452" y="{y}">{seg["pct"]:.1f}%</text>\n'
-            f'  <text class="desc" x="470" y="{y}">{seg["desc"]}</text>'
+            f'  <rect x="{legend_x}" y="{y - 10}" width="12" height="12" rx="3" fill="{seg["color"]}"/>\n'
+            f'  <text class="name" x="{legend_x + 22}" y="{y}">{seg["name"]}</text>\n'
+            f'  <text class="pct" x="{legend_x + 180}" y="{y}">{seg["pct"]:.1f}%</text>'
+            + ("" if compact else f'\n  <text class="desc" x="470" y="{y}">{seg["desc"]}</text>')
         )
+    foot = (f"auto-updated {updated}" if compact else
+            f"auto-updated {updated} · {total_mb:.1f} MB across {repo_count} {scope}, forks excluded")
 
     # The headline is the biggest named language — Others is a bucket, never
     # the answer to "what does he write?".
@@ -270,172 +1067,333 @@ def render_language_donut(segments: List[Dict], total_mb: float,
     lead = max(named, key=lambda s: s["pct"]) if named else segments[0]
 
     label = " · ".join(f'{s["name"]} {s["pct"]:.1f}%' for s in segments)
-    updated = datetime.now().strftime("%Y-%m-%d")
 
-    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 840 250" width="840" height="250" role="img" aria-label="Share of code by language across coldzero94's {repo_count} non-fork {scope}, {total_mb:.1f} MB in total. {lead["name"]} leads at {lead["pct"]:.1f}%. Full breakdown: {label}. Auto-updated {updated}.">
+    t = theme
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {view_w} 250" width="{view_w}" height="250" role="img" aria-label="Share of code by language across {owner}'s {repo_count} non-fork {scope}, {total_mb:.1f} MB in total. {lead["name"]} leads at {lead["pct"]:.1f}%. Full breakdown: {label}. Auto-updated {updated}.">
   <style>
     text {{ font: 13px ui-monospace, 'SF Mono', Menlo, Consolas, monospace; }}
-    .name  {{ fill: #e6edf3; }}
-    .pct   {{ fill: #e6edf3; text-anchor: end; font-variant-numeric: tabular-nums; }}
-    .desc  {{ fill: #8b949e; font-size: 12px; }}
-    .lead  {{ fill: #e6edf3; font-size: 20px; font-weight: 600; text-anchor: middle; }}
-    .share {{ fill: #e6edf3; font-size: 13px; text-anchor: middle; }}
-    .of    {{ fill: #8b949e; font-size: 10.5px; text-anchor: middle; }}
-    .foot  {{ fill: #6e7681; font-size: 11.5px; }}
+    .name  {{ fill: {t["text"]}; }}
+    .pct   {{ fill: {t["text"]}; text-anchor: end; font-variant-numeric: tabular-nums; }}
+{"" if compact else f'    .desc  {{ fill: {t["muted"]}; font-size: 12px; }}{chr(10)}'}    .lead  {{ fill: {t["text"]}; font-size: 20px; font-weight: 600; text-anchor: middle; }}
+    .share {{ fill: {t["text"]}; font-size: 13px; text-anchor: middle; }}
+    .of    {{ fill: {t["muted"]}; font-size: 10.5px; text-anchor: middle; }}
+    .foot  {{ fill: {t["faint"]}; font-size: 11.5px; }}
   </style>
-  <rect x="0.5" y="0.5" width="839" height="249" rx="12" fill="#0d1117" stroke="#30363d"/>
+  <rect x="0.5" y="0.5" width="{view_w - 1}" height="249" rx="12" fill="{t["surface"]}" stroke="{t["border"]}"/>
 
-  <circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="#21262d" stroke-width="{width}"/>
+  <circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="{t["track"]}" stroke-width="{width}"/>
 {chr(10).join(arcs)}
   <text class="lead" x="{cx}" y="{cy - 11}">{lead["name"]}</text>
   <text class="share" x="{cx}" y="{cy + 7}">{lead["pct"]:.1f}%</text>
   <text class="of" x="{cx}" y="{cy + 23}">of my code</text>
 
 {chr(10).join(rows)}
-  <text class="foot" x="272" y="230">auto-updated {updated} · {total_mb:.1f} MB across {repo_count} {scope}, forks excluded</text>
+  <text class="foot" x="{legend_x}" y="230">{foot}</text>
 </svg>
 """
 
 
-def update_language_donut(lang_stats: Dict[str, int], repos: List[Dict]):
-    """Regenerate assets/languages-donut.svg from the language totals"""
-    print("🍩 Updating language donut...")
+def language_model(lang_stats: Dict[str, int], repo_count: int, sees_private: bool,
+                   updated: str, owner: str = OWNER) -> Dict:
+    """Everything the donut variants share, worked out once: segments (colored
+    and ordered for the dark theme), totals and footer facts.
+
+    repo_count and sees_private describe the repos the totals came from (see
+    ingest_repos) — forks excluded, and possibly public-only. None when there
+    is nothing to draw, so the previous donuts stay.
+    """
+    print("🍩 Building language model...")
     segments = build_language_segments(lang_stats)
     if not segments:
         print("⚠️  No language data; keeping previous donut")
-        return
-
-    # Count the repos the byte totals actually came from — analyze_language_stats
-    # skips forks, so counting everything would overstate the footer.
-    counted = [r for r in repos if not r.get("isFork")]
+        return None
 
-    # In Actions the default GITHUB_TOKEN is scoped to this repository, so
-    # `gh repo list` comes back public-only and the total is a slice of the
-    # real one. Say which it is rather than claim a coverage we don't have —
-    # and let it correct itself if the workflow is ever given a wider token.
-    sees_private = any(r.get("isPrivate") for r in counted)
+    # Let the footer correct itself if the workflow is ever given a wider token.
     scope = "repos" if sees_private else "public repos"
 
     total_mb = sum(lang_stats.values()) / 1_000_000
-    with open("assets/languages-donut.svg", "w", encoding="utf-8") as f:
-        f.write(render_language_donut(segments, total_mb, len(counted), scope))
-    print(f"✅ languages-donut.svg updated ({len(segments)} segments, "
-          f"{total_mb:.1f} MB across {len(counted)} {scope})")
+    print(f"   {len(segments)} segments, {total_mb:.1f} MB across {repo_count} {scope}")
+    colors = tuple(s["color"].lower() for s in segments)
+    return {"segments": segments, "total_mb": total_mb, "repo_count": repo_count,
+            "scope": scope, "updated": updated, "owner": owner, "rings": {colors: segments}}
 
 
-def update_readme_section(content: str, section_marker: str, new_content: str) -> str:
-    """Update a specific section in README marked by comments"""
-    start_marker = f"<!-- AUTO-UPDATE:{section_marker}:START -->"
-    end_marker = f"<!-- AUTO-UPDATE:{section_marker}:END -->"
+def themed_segments(model: Dict, theme: str) -> List[Dict]:
+    """The model's segments in theme's colors, re-ordered if those need it.
+
+    A ring is validated once per distinct set of segment colors: a theme
+    that recolors nothing reuses the dark order as is, and every size of one
+    theme shares its order.
+    """
+    recolor = THEMES[theme]["recolor"]
+    segments = [{**s, "color": recolor.get(s["color"].lower(), s["color"])} for s in model["segments"]]
+    colors = tuple(s["color"].lower() for s in segments)
+    if colors not in model["rings"]:
+        print(f"   re-validating the ring on the {theme} surface")
+        model["rings"][colors] = order_ring(segments)
+    return model["rings"][colors]
+
+
+def language_donut(model: Dict, theme: str = "dark", size: str = "full") -> str:
+    """One languages-donut variant's document, or None to keep the current one"""
+    if model is None:
+        return None
+    return render_language_donut(themed_segments(model, theme), model["total_mb"], model["repo_count"],
+                                 model["scope"], model["updated"], model["owner"],
+                                 THEMES[theme], size)
+
 
-    # Check if markers exist
-    if start_marker not in content or end_marker not in content:
-        print(f"⚠️  Markers for {section_marker} not found")
-        return content
+def variant_path(path: str, theme: str = "dark", size: str = "full") -> str:
+    """Where the (theme, size) variant of path lives: dark and full are the
+    unsuffixed defaults, so assets/x.svg → assets/x-compact-light.svg"""
+    stem, ext = os.path.splitext(path)
+    suffix = "".join(f"-{v}" for v, default in ((size, "full"), (theme, "dark")) if v != default)
+    return stem + suffix + ext
 
-    # Find positions
-    start_idx = content.find(start_marker) + len(start_marker)
-    end_idx = content.find(end_marker)
 
-    if end_idx <= start_idx:
-        print(f"❌ Invalid markers for {section_marker}")
-        return content
+def splice_sections(content: str, sections: Dict[str, str]) -> Tuple[str, List[str]]:
+    """Replace named AUTO-UPDATE regions of content; (new content, changed names).
+
+    A string-level front end to regions.splice, which does the work in one
+    scan over the markers and leaves regions that wouldn't change alone.
+    """
+    data, changed = regions.splice(content.encode("utf-8"),
+                                   {f"AUTO-UPDATE:{name}": text for name, text in sections.items()})
+    return data.decode("utf-8"), [name.split(":", 1)[1] for name in changed]
 
-    # Replace section
-    updated = content[:start_idx] + "\n" + new_content + "\n" + content[end_idx:]
 
-    return updated
+def update_readme_section(content: str, section_marker: str, new_content: str) -> str:
+    """Update a specific section in README marked by comments"""
+    return splice_sections(content, {section_marker: new_content})[0]
 
 
-def format_recent_pushes(repos: List[Dict], limit: int = 3) -> str:
+def format_recent_pushes(repos: Iterable[Dict], limit: int = 3, owner: str = OWNER) -> str:
     """One-line freshness signal: latest public non-fork repos by push date"""
-    candidates = [
-        r for r in repos
-        if not r.get("isPrivate") and not r.get("isFork")
-        and r.get("name") != "coldzero94" and r.get("pushedAt")
-    ]
-    candidates.sort(key=lambda r: r["pushedAt"], reverse=True)
+    # nlargest keeps only `limit` repos in memory and breaks ties the way a
+    # stable sort would, so a stream and a list come out the same.
+    candidates = heapq.nlargest(limit, (r for r in repos if _is_shipping(r, owner)),
+                                key=lambda r: r["pushedAt"])
 
     parts = []
-    for repo in candidates[:limit]:
+    for repo in candidates:
         date = repo["pushedAt"][:10]
-        parts.append(f"[{repo['name']}](https://github.com/coldzero94/{repo['name']}) `{date}`")
+        parts.append(f"[{repo['name']}](https://github.com/{owner}/{repo['name']}) `{date}`")
 
     if not parts:
         return ""
     return "🔨 **Recent pushes:** " + " · ".join(parts)
 
 
-def fetch_velog_writing(max_posts: int = 5, max_age_days: int = 540) -> str:
+def _recent_posts(feed, max_posts: int, cutoff: datetime) -> List[Tuple[str, str, str]]:
+    """(published ISO timestamp, title, link) of the newest posts in an RSS stream.
+
+    The feed is parsed as it is read, one <item> at a time, and reading stops
+    at the first post older than cutoff — the feed is newest first — or once
+    max_posts are in hand, so the rest of a long feed is never downloaded.
+    """
+    posts = []
+    for _, item in ET.iterparse(feed, events=("end",)):
+        if item.tag != "item":
+            continue
+        title = (item.findtext("title") or "").strip()
+        link = (item.findtext("link") or "").strip()
+        pub = item.findtext("pubDate")
+        item.clear()
+        if not (title and link and pub):
+            continue
+        published = parsedate_to_datetime(pub)
+        if published < cutoff:
+            break
+        posts.append((published.isoformat(), title, link))
+        if len(posts) >= max_posts:
+            break
+    return posts
+
+
+def fetch_velog_writing(max_posts: int = 5, max_age_days: int = 540,
+                        url: str = VELOG_RSS, cache_path: str = VELOG_CACHE) -> str:
     """Latest writing section from the velog RSS feed.
 
     Returns an empty string when there are no sufficiently recent posts,
     which collapses the section entirely (a stale feed is worse than none).
+
+    The feed's ETag / Last-Modified are kept with the posts they produced, and
+    sent back as a conditional request; on 304 Not Modified the kept posts are
+    rendered again (re-checked against today's cutoff) without a download.
     """
-    url = "https://v2.velog.io/rss/@coldzero"
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    # Validators only vouch for posts picked with the same limits.
+    if cached.get("url") != url or cached.get("limits") != [max_posts, max_age_days]:
+        cached = {}
+
+    request = urllib.request.Request(url)
+    if cached.get("etag"):
+        request.add_header("If-None-Match", cached["etag"])
+    if cached.get("last_modified"):
+        request.add_header("If-Modified-Since", cached["last_modified"])
+
     try:
-        with urllib.request.urlopen(url, timeout=15) as resp:
-            root = ET.fromstring(resp.read())
+        with tracing.span("urlopen", url=url) as span, fixtures.urlopen(request, timeout=15) as resp:
+            span.set(status=resp.status)
+            posts = _recent_posts(tracing.counting(resp, span), max_posts, cutoff)
+            validators = {"etag": resp.headers.get("ETag"),
+                          "last_modified": resp.headers.get("Last-Modified")}
+        tracing.count("velog_cache.miss")
+    except urllib.error.HTTPError as e:
+        span.set(status=e.code)
+        if e.code != 304 or "posts" not in cached:
+            print(f"⚠️  Could not fetch velog RSS ({e}); leaving writing section as-is")
+            raise
+        tracing.count("velog_cache.hit")
+        print("   velog RSS not modified; reusing the last posts")
+        posts, validators = cached["posts"], None
     except Exception as e:
         print(f"⚠️  Could not fetch velog RSS ({e}); leaving writing section as-is")
         raise
 
-    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    if validators and any(validators.values()):
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "limits": [max_posts, max_age_days],
+                           "posts": posts, **validators}, f)
+        except OSError as e:
+            print(f"⚠️  Could not save velog cache ({e})")
+
     rows = []
-    for item in root.iter("item"):
-        title = (item.findtext("title") or "").strip()
-        link = (item.findtext("link") or "").strip()
-        pub = item.findtext("pubDate")
-        if not (title and link and pub):
-            continue
-        published = parsedate_to_datetime(pub)
-        if published < cutoff:
-            continue
-        rows.append(f"| {published.strftime('%Y-%m-%d')} | [{title}]({link}) |")
-        if len(rows) >= max_posts:
-            break
+    for published, title, link in posts:
+        published = datetime.fromisoformat(published)
+        if published >= cutoff:
+            rows.append(f"| {published.strftime('%Y-%m-%d')} | [{title}]({link}) |")
 
     if not rows:
         return ""
     return "## ✍️ Latest writing\n\n| Date | Post |\n| --- | --- |\n" + "\n".join(rows)
 
 
-def fetch_contribution_days() -> List[Dict]:
-    """Daily contribution counts for the past year via GraphQL"""
-    query = (
-        'query { user(login:"coldzero94") { contributionsCollection { '
-        "contributionCalendar { totalContributions weeks { contributionDays "
-        "{ date contributionCount } } } } } }"
-    )
-    output = run_command(["gh", "api", "graphql", "-f", f"query={query}"])
-    calendar = json.loads(output)["data"]["user"]["contributionsCollection"]["contributionCalendar"]
-    days = [d for w in calendar["weeks"] for d in w["contributionDays"]]
-    days.sort(key=lambda d: d["date"])
-    return days
+def _calendar_range(since: datetime, until: datetime = None) -> Dict[str, str]:
+    """$from/$to for CALENDAR_FIELD"""
+    until = until or datetime.now(timezone.utc)
+    return {"from": since.strftime("%Y-%m-%dT%H:%M:%SZ"), "to": until.strftime("%Y-%m-%dT%H:%M:%SZ")}
 
 
-def render_hero_stats(days: List[Dict]) -> str:
-    """Render the status-bar contents of the terminal hero (text + sparkline)"""
-    counts = [d["contributionCount"] for d in days]
-    total = sum(counts)
-    best_day = max(counts)
-    avg = total / max(len(counts), 1)
+def fetch_contribution_days(owner: str = OWNER, since: datetime = None, until: datetime = None,
+                            priority: int = CRITICAL) -> List[Dict]:
+    """Daily contribution counts via GraphQL: since..until (at most a year), or the past year"""
+    query = (f"query($owner: String!, $from: DateTime, $to: DateTime) {{ "
+             f"user(login: $owner) {{ {CALENDAR_FIELD} }} {RATE_LIMIT_FIELD} }}")
+    variables = {"owner": owner, "from": None, "to": None}
+    if since:
+        variables.update(_calendar_range(since, until))
+    return _calendar_days(github_client().graphql(query, variables, priority=priority)["user"])
+
+
+def contribution_store(owner: str = OWNER) -> ContributionStore:
+    return ContributionStore(os.path.join(CONTRIBUTIONS_DIR, owner))
+
+
+def _midnight(day) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
 
+
+def catch_up_contributions(owner: str, store: ContributionStore,
+                           backfill_years: int = BACKFILL_YEARS) -> datetime:
+    """Bring store to within a year of today; where the next fetch should start.
+
+    A new store is first filled backfill_years back, and one whose last
+    day is over a year old (a long-lost cache) has the gap filled, a year
+    per query — both OPTIONAL, so a thin rate budget only shortens the
+    history (or, for a gap, leaves it to the next run). None means the next
+    fetch should just take the past year.
+    """
+    now = datetime.now(timezone.utc)
+    horizon = now - timedelta(days=360)  # what's left fits one ≤ 1-year range
+    since = (_midnight(store.next_day()) if store.next_day()
+             else now - timedelta(days=365 * backfill_years) if backfill_years > 1 else None)
+    try:
+        # A last sliver no longer than the provisional days is left to the
+        # regular fetch, as it would all land in the tail anyway.
+        while since and since < horizon - timedelta(days=store.provisional):
+            until = min(since + timedelta(days=364), horizon)
+            store.extend(fetch_contribution_days(owner, since, until, priority=OPTIONAL))
+            print(f"   contributions {since:%Y-%m-%d}..{until:%Y-%m-%d} stored")
+            since = _midnight(store.next_day())
+    except RateLimitedError as e:
+        print(f"⚠️  Contribution history backfill stopped ({e})")
+    return _midnight(store.next_day()) if store.next_day() else None
+
+
+def fetch_github(list_repos: Callable = iter_repos_cached, owner: str = OWNER,
+                 store: ContributionStore = None, cards: Iterable[str] = ()) -> Dict:
+    """The repo summary and contribution figures, from one batched stream.
+
+    The calendar rides along with the first page of repos — only the days
+    since the contribution store's last final one — and the pages are
+    aggregated by ingest_repos as they arrive. contributions is the
+    store's figures() and calendar the days the isometric calendar draws,
+    both None when the calendar couldn't be had; the repo summary is
+    all-or-nothing. While the store still has a gap of over a year to
+    fill, the past year is fetched and scanned instead, and the store waits
+    for the next run. The repos named in cards are picked out of the same
+    stream for the project cards.
+    """
+    store = store or contribution_store(owner)
+    since = catch_up_contributions(owner, store)
+    if since and since < datetime.now(timezone.utc) - timedelta(days=365):
+        since, store = None, None
+    calendar = {}
+
+    def on_calendar(days):
+        if days is None:
+            return
+        if store is None:
+            calendar["figures"], calendar["days"] = hero_figures(days), days[-CALENDAR_DAYS:]
+        else:
+            store.extend(days)
+            calendar["figures"], calendar["days"] = store.figures(), store.days(CALENDAR_DAYS)
+
+    summary = ingest_repos(list_repos(owner=owner, on_calendar=on_calendar, calendar_from=since),
+                           owner=owner, cards=cards)
+    return {"summary": summary, "contributions": calendar.get("figures"),
+            "calendar": calendar.get("days")}
+
+
+def hero_figures(days: List[Dict], window: int = 365, spark: int = 30) -> Dict:
+    """ContributionStore.figures() for a plain list of days, by scanning it"""
+    counts = [d["contributionCount"] for d in days][-window:]
     best_streak = streak = 0
     for c in counts:
         streak = streak + 1 if c > 0 else 0
         best_streak = max(best_streak, streak)
+    return {"total": sum(counts), "best_day": max(counts, default=0), "best_streak": best_streak,
+            "current_streak": streak, "avg": sum(counts) / max(len(counts), 1),
+            "covered": len(counts), "spark": [d["contributionCount"] for d in days][-spark:]}
+
+
+def render_hero_stats(figures: Dict, theme: Dict = THEMES["dark"]) -> str:
+    """Render the status-bar contents of the terminal hero (text + sparkline)
+
+    figures is what ContributionStore.figures() (or hero_figures) returns;
+    theme gives the sparkline's colors (the text takes the file's own).
+    """
+    total, best_day = figures["total"], figures["best_day"]
+    best_streak, avg = figures["best_streak"], figures["avg"]
 
     # 30-day sparkline, right-aligned inside the status bar (y 314..334).
     # sqrt scale so a single huge day doesn't flatten every other bar.
-    last30 = counts[-30:]
+    last30 = figures["spark"][-30:]
     max30 = max(max(last30), 1)
-    greens = ["#0e4429", "#006d32", "#26a641", "#39d353"]
+    greens = theme["greens"]
     bars = []
     for i, c in enumerate(last30):
         x = 609 + i * 7
         if c == 0:
-            bars.append(f'<rect x="{x}" y="332" width="4" height="2" rx="1" fill="#30363d"/>')
+            bars.append(f'<rect x="{x}" y="332" width="4" height="2" rx="1" fill="{theme["empty"]}"/>')
         else:
             ratio = (c / max30) ** 0.5
             h = max(4, round(ratio * 20))
@@ -458,81 +1416,477 @@ def render_hero_stats(days: List[Dict]) -> str:
     )
 
 
-def update_hero_stats():
-    """Refresh the live status bar inside assets/terminal-hero.svg"""
-    print("📈 Updating hero status bar...")
-    hero_path = "assets/terminal-hero.svg"
+def hero_stats(figures: Dict, theme: str = "dark") -> str:
+    """The body of the STATS region in theme's terminal hero, or None to keep it"""
+    print(f"📈 Rendering hero status bar ({theme})...")
+    if figures is None:
+        print("⚠️  No contribution data; keeping previous version")
+        return None
     try:
-        days = fetch_contribution_days()
-        stats = render_hero_stats(days)
+        return render_hero_stats(figures, THEMES[theme])
     except Exception as e:
         print(f"⚠️  Could not build hero stats ({e}); keeping previous version")
-        return
+        return None
 
-    with open(hero_path, "r", encoding="utf-8") as f:
-        svg = f.read()
 
-    pattern = r"(<!-- STATS:START -->\n)(.*?)(  <!-- STATS:END -->)"
-    if not re.search(pattern, svg, re.DOTALL):
-        print("⚠️  STATS markers not found in terminal-hero.svg")
-        return
-    svg = re.sub(pattern, r"\1" + stats + r"\3", svg, flags=re.DOTALL)
+# GitHub's dark-theme calendar greens, from no contributions up to the top
+# quartile of days (the hero sparkline uses the top four).
+CALENDAR_LEVELS = ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"]
+CALENDAR_DAYS = 371  # 53 weeks, as GitHub's own calendar shows
 
-    with open(hero_path, "w", encoding="utf-8") as f:
-        f.write(svg)
-    print("✅ terminal-hero.svg status bar updated!")
+# Isometric cell geometry, in whole pixels: a day's tile is a rhombus
+# 2·TILE_X wide and 2·TILE_Y tall (close to true isometric), and the busiest
+# day's bar BAR_Z high. Integral coordinates keep the paths short.
+TILE_X, TILE_Y, BAR_Z = 7, 4, 24
 
 
-def update_readme_simple(repos: List[Dict]):
-    """Refresh the marker-delimited sections of README.md"""
-    print("📝 Updating README.md...")
+def _shade(hex_color: str, slope: float) -> str:
+    """hex_color with its light scaled by slope, in linear RGB — what an
+    feComponentTransfer filter would draw, baked into a plain fill"""
+    raw = hex_color.lstrip("#")
+    channels = []
+    for i in (0, 2, 4):
+        c = int(raw[i:i + 2], 16) / 255
+        linear = slope * (c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4)
+        c = linear * 12.92 if linear <= 0.0031308 else 1.055 * linear ** (1 / 2.4) - 0.055
+        channels.append(round(c * 255))
+    return "#" + "".join(f"{c:02x}" for c in channels)
+
+
+def _calendar_cells(days: List[Dict]) -> List[Tuple[int, int, int, int]]:
+    """(week, weekday, level, bar height) per day, weeks running Sunday to Saturday"""
+    first = datetime.fromisoformat(days[0]["date"]).date()
+    counts = [d["contributionCount"] for d in days]
+    peak = max(max(counts), 1)
+    # Levels split the non-zero days at their quartiles, as GitHub's do.
+    busy = sorted(c for c in counts if c)
+    cuts = [busy[len(busy) * q // 4] for q in (1, 2, 3)] if busy else []
+    offset = (first.weekday() + 1) % 7  # Sunday is 0
+    cells = []
+    for i, count in enumerate(counts):
+        level = 1 + sum(count > cut for cut in cuts) if count else 0
+        cells.append(((i + offset) // 7, (i + offset) % 7, level, round(BAR_Z * count / peak)))
+    return cells
+
+
+def _draw_layers(cells: List[Tuple[int, int, int, int]]) -> List[Dict[Tuple[int, int], List]]:
+    """Cells grouped into draw layers, each {(level, face): [(x, y, height)]}.
+
+    Painting back to front one cell at a time needs three elements per day.
+    Instead, every cell gets the lowest layer that still comes after each
+    cell behind it that it overlaps, and a layer draws all of one colour as
+    a single path. A flat cell overlaps nothing (layer 0). A raised one
+    covers the cell k steps straight behind it once it is taller than
+    2·TILE_Y·(k - 1), and the two diagonal neighbours k steps back once it
+    is taller than 2·TILE_Y·k.
+    """
+    layer_of, layers = {}, []
+    for w, d, level, h in sorted(cells, key=lambda c: (c[0] + c[1], c[0])):
+        layer = 0
+        if h:
+            behind = []
+            for k in range(1, h // (2 * TILE_Y) + 2):
+                behind.append((w - k, d - k))
+            for k in range(0, (h - 1) // (2 * TILE_Y) + 1):
+                behind += [(w - k - 1, d - k), (w - k, d - k - 1)]
+            layer = 1 + max((layer_of[b] for b in behind if b in layer_of), default=0)
+        layer_of[(w, d)] = layer
+        while len(layers) <= layer:
+            layers.append({})
+        x = TILE_X * (w - d + 6)
+        y = TILE_Y * (w + d + 1) + BAR_Z
+        faces = layers[layer]
+        faces.setdefault((level, 0), []).append((x, y - h, h))
+        if h:
+            faces.setdefault((level, 1), []).append((x, y - h, h))
+            faces.setdefault((level, 2), []).append((x + TILE_X, y + TILE_Y - h, h))
+    return layers
+
+
+def _counted(n: int, unit: str) -> str:
+    """n of unit, pluralized and with thousands separators (1 day, 1,234 days)"""
+    return f"{n:,} {unit}" if n == 1 else f"{n:,} {unit}s"
+
+
+def render_isocalendar(days: List[Dict], figures: Dict) -> str:
+    """The past year of contributions as a standalone isometric SVG.
+
+    days are {date, contributionCount}, oldest first (fetch_contribution_days
+    or ContributionStore.days); figures the matching hero_figures or
+    ContributionStore.figures(), for the stats beside the chart. The
+    description dates the window those figures cover, which is a few days
+    shorter than what is drawn (whole weeks). Each day is a bar as tall as
+    its count relative to the busiest day, coloured by its quartile. Side
+    faces are the top colour darkened, baked in rather than filtered, and
+    every (layer, colour) pair is one path of relative moves — see
+    _draw_layers — so the file stays a few KB.
+    """
+    cells = _calendar_cells(days)
+    faces = {
+        0: "l{tx}-{ty} {tx} {ty}-{tx} {ty}z",
+        1: "l{tx} {ty}v{h}l-{tx}-{ty}z",
+        2: "l{tx}-{ty}v{h}l-{tx} {ty}z",
+    }
+    paths, used = [], set()
+    for layer in _draw_layers(cells):
+        for (level, face), origins in sorted(layer.items()):
+            d, last = [], None
+            for x, y, h in origins:
+                d.append(f"M{x} {y}" if last is None else f"m{x - last[0]} {y - last[1]}")
+                d.append(faces[face].format(tx=TILE_X, ty=TILE_Y, h=h))
+                last = (x, y)
+            used.add((level, face))
+            paths.append(f'<path class="{"tlr"[face]}{level}" d="{"".join(d)}"/>')
+    # One class per fill actually drawn: top, left (darker) and right (darkest) faces.
+    fills = [f'    .{"tlr"[face]}{level} {{ fill: '
+             f'{_shade(CALENDAR_LEVELS[level], (1, 0.6, 0.2)[face])}; }}' for level, face in sorted(used)]
+
+    # The chart runs from the top left to the bottom right; the stats sit in
+    # the empty corner above it.
+    total, best_day = figures["total"], figures["best_day"]
+    current, best = _counted(figures["current_streak"], "day"), _counted(figures["best_streak"], "day")
+    window = days[-figures["covered"]:] if figures["covered"] else days
+    stats = [("contributions in the last year", f"{total:,}"),
+             ("current streak", current),
+             ("best streak", best),
+             ("highest in a day", f"{best_day}"),
+             ("average per day", f"~{figures['avg']:.2f}")]
+    lines = [f'  <text x="464" y="{58 + i * 18}">{label} <tspan class="n">{value}</tspan></text>'
+             for i, (label, value) in enumerate(stats)]
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 480 300" width="480" height="300" role="img" aria-label="Isometric contribution calendar, {window[0]['date']} to {window[-1]['date']}: {_counted(total, "contribution")}, best day {best_day}, current streak {current}, best streak {best}.">
+  <style>
+    text {{ font: 11.5px ui-monospace, 'SF Mono', Menlo, Consolas, monospace; fill: #8b949e; text-anchor: end; }}
+    .n {{ fill: #e6edf3; }}
+    .title {{ fill: #e6edf3; font-size: 13px; }}
+{chr(10).join(fills)}
+  </style>
+  <rect x="0.5" y="0.5" width="479" height="299" rx="12" fill="#0d1117" stroke="#30363d"/>
+  <text class="title" x="464" y="32">Contributions calendar</text>
+{chr(10).join(lines)}
+  <g transform="translate(16 16)">
+{chr(10).join("    " + p for p in paths)}
+  </g>
+</svg>
+"""
 
-    readme_path = "README.md"
 
-    try:
-        with open(readme_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except FileNotFoundError:
-        print("❌ README.md not found!")
-        sys.exit(1)
+def isocalendar(days: List[Dict], figures: Dict) -> str:
+    """The github-isocalendar.svg document, or None to keep the current one"""
+    print("🗓️  Rendering isometric calendar...")
+    if not days or figures is None:
+        print("⚠️  No contribution data; keeping previous calendar")
+        return None
+    return render_isocalendar(days, figures)
 
-    # Update 1: recent-pushes freshness line
-    content = update_readme_section(content, "SHIPPING", format_recent_pushes(repos))
 
-    # Update 2: latest writing from velog (section disappears when feed is stale)
-    try:
-        content = update_readme_section(content, "WRITING", fetch_velog_writing())
-    except Exception:
-        pass  # network hiccup: keep the previous section contents
+# Project cards: description characters per line (monospace 12px across the
+# card's 260px text column), and the swatch for a repo with no language color.
+CARD_LINE_CHARS = 34
+CARD_FALLBACK_COLOR = "#8b949e"
 
-    # Write back
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(content)
 
-    print("✅ README.md updated successfully!")
+def _wrap_description(text: str, lines: int, width: int = CARD_LINE_CHARS) -> List[str]:
+    """text wrapped to width, cut to lines with an ellipsis if it runs over"""
+    wrapped = textwrap.wrap(text, width)
+    if len(wrapped) > lines:
+        wrapped = wrapped[:lines]
+        wrapped[-1] = wrapped[-1][:width - 1].rstrip() + "…"
+    return wrapped
 
 
-def main():
-    """Main execution"""
-    print("🚀 Starting automated profile update...")
-    print(f"⏰ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+def render_project_card(card: Dict, repo: Dict) -> str:
+    """One 300×170 project card: name, description, optional command, language and stars.
+
+    card is a PROJECT_CARDS entry; repo the CARD_FIELDS ingest_repos kept
+    for it. Every card comes out of this one template.
+    """
+    name, cmd = card["repo"], card.get("cmd")
+    description = (repo.get("description") or "").strip()
+    language = repo.get("primaryLanguage") or {}
+    lang_name = language.get("name")
+    color = language.get("color") or CARD_FALLBACK_COLOR
+    stars = repo.get("stargazerCount") or 0
+    pushed = (repo.get("pushedAt") or "")[:10]
+
+    label = f"{name} — {description.rstrip('.')}" if description else name
+    label += "".join(f". {part}" for part in (cmd, lang_name) if part) + "."
+    lines = [f'  <text class="desc" x="20" y="{64 + 18 * i}">{escape(line)}</text>'
+             for i, line in enumerate(_wrap_description(description, 3 if cmd else 4))]
+    if cmd:
+        lines.append(f'  <text class="cmd" x="20" y="124">$ {escape(cmd)}</text>')
+    if lang_name:
+        lines.append(f'  <circle cx="24" cy="143" r="4" fill="{color}"/>')
+        lines.append(f'  <text class="meta" x="34" y="147">{escape(lang_name)}</text>')
+    meta = " · ".join(part for part in (f"★ {stars}" if stars else "", pushed) if part)
+    if meta:
+        lines.append(f'  <text class="meta" x="262" y="147" text-anchor="end">{meta}</text>')
+
+    cmd_style = "    .cmd  { font-size: 11.5px; fill: #7ee787; }\n" if cmd else ""
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 300 170" width="300" height="170" role="img" aria-label="{escape(label, {'"': '&quot;'})}">
+  <style>
+    text {{ font: 12px ui-monospace, 'SF Mono', Menlo, Consolas, monospace; }}
+    .name {{ font-size: 15px; font-weight: 600; fill: #e6edf3; }}
+    .desc {{ fill: #8b949e; }}
+{cmd_style}    .meta {{ font-size: 11.5px; fill: #8b949e; }}
+  </style>
+  <rect x="0.5" y="0.5" width="299" height="169" rx="12" fill="#0d1117" stroke="#30363d"/>
+  <rect x="20" y="23" width="11" height="11" rx="3" fill="{color}"/>
+  <text class="name" x="39" y="33">{escape(name)}</text>
+{"".join(line + chr(10) for line in lines)}  <text class="meta" x="280" y="147" text-anchor="end">↗</text>
+</svg>
+"""
+
+
+def project_card(card: Dict, repo: Dict) -> str:
+    """A card's SVG document, or None to keep the current one"""
+    if repo is None:
+        print(f"⚠️  {card['repo']} not in the repo listing; keeping its card")
+        return None
+    return render_project_card(card, repo)
+
+
+# Every module whose code shapes an artifact: this one, and the ones it
+# renders, aggregates and patches through.
+RENDERER_MODULES = ("update_profile.py", "regions.py", "contributions.py", "build.py")
+
+
+def renderer_digest() -> str:
+    """One digest of every RENDERER_MODULES source, so editing any of them
+    rebuilds what they draw"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return fingerprint([file_digest(os.path.join(here, name)) for name in RENDERER_MODULES])
+
+
+def artifact_graph(summary: Dict, contributions: Dict, calendar: List[Dict] = None,
+                   writing: str = None, owner: str = OWNER, root: str = ".",
+                   manifest: str = BUILD_MANIFEST, skip_missing: bool = False,
+                   cards: List[Dict] = ()) -> BuildGraph:
+    """Every generated artifact, with the inputs it is rendered from.
+
+    The renderers' source (renderer_digest) is an input of each, so a
+    change to how something is drawn rebuilds it even when the data stood
+    still.
+    calendar is fetch_github's past-year days, for the isometric calendar.
+    writing is the rendered velog section, or None to keep the current one.
+    Paths are under root; with skip_missing, a marker region whose file
+    isn't there is left out rather than treated as an error. cards are
+    PROJECT_CARDS-style entries, each its own artifact fed by the metadata
+    ingest_repos kept for it, so only the cards whose repo changed are
+    redrawn. The donut is written in every THEMES × DONUT_SIZES variant
+    (see variant_path). The hero, calendar and card renders and the
+    donuts' shared model are picklable, so BuildGraph.build can hand them to
+    a process pool.
+    """
+    graph = BuildGraph(manifest)
+    renderer = renderer_digest()
+    readme = os.path.normpath(os.path.join(root, "README.md"))
+    hero = os.path.normpath(os.path.join(root, "assets", "terminal-hero.svg"))
+
+    # README: recent-pushes freshness line, and latest writing from velog
+    # (that section disappears when the feed is stale).
+    if not (skip_missing and not os.path.exists(readme)):
+        graph.add("readme-shipping", readme,
+                  {"recent": summary["recent"], "owner": owner, "renderer": renderer},
+                  lambda: format_recent_pushes(summary["recent"], owner=owner),
+                  region="AUTO-UPDATE:SHIPPING")
+        graph.add("readme-writing", readme, {"writing": writing, "renderer": renderer},
+                  lambda: writing, region="AUTO-UPDATE:WRITING")
+
+    # Every donut variant is drawn from one model, built once if any variant
+    # is stale (in the render pool, when there is one). The model holds the
+    # ring search, so the variants themselves are cheap and render here.
+    donut_model = functools.partial(
+        language_model, summary["lang_stats"], summary["repo_count"],
+        summary["sees_private"], summary["updated"], owner)
+    donut_inputs = {"lang_stats": summary["lang_stats"], "repo_count": summary["repo_count"],
+                    "sees_private": summary["sees_private"], "updated": summary["updated"],
+                    "owner": owner, "palette": [palette_hues(), CVD_FLOOR, NORMAL_FLOOR],
+                    "renderer": renderer}
+    donut = os.path.normpath(os.path.join(root, "assets", "languages-donut.svg"))
+    for theme in THEMES:
+        for size in DONUT_SIZES:
+            path = variant_path(donut, theme, size)
+            graph.add(os.path.splitext(os.path.basename(path))[0], path,
+                      {**donut_inputs, "theme": THEMES[theme], "size": size},
+                      functools.partial(language_donut, theme=theme, size=size), needs=donut_model)
+
+    # The hero is hand-drawn; a themed copy of it, where there is one, gets
+    # its status bar refreshed too.
+    for theme in THEMES:
+        path = variant_path(hero, theme)
+        if not os.path.exists(path) and (skip_missing or theme != "dark"):
+            continue
+        graph.add("hero-stats" if theme == "dark" else f"hero-stats-{theme}", path,
+                  {"figures": contributions, "theme": THEMES[theme], "renderer": renderer},
+                  functools.partial(hero_stats, contributions, theme), region="STATS", offload=True)
 
-    # Fetch and analyze
-    repos = get_all_repos()
-    lang_stats = analyze_language_stats(repos)
+    graph.add("isocalendar", os.path.normpath(os.path.join(root, "github-isocalendar.svg")),
+              {"days": calendar, "figures": contributions, "renderer": renderer},
+              functools.partial(isocalendar, calendar, contributions), offload=True)
 
-    # Update README
-    update_readme_simple(repos)
+    for card in cards:
+        repo = summary.get("cards", {}).get(card["repo"])
+        graph.add(f"card-{card['repo']}",
+                  os.path.normpath(os.path.join(root, "assets", f"card-{card['repo']}.svg")),
+                  {"card": card, "repo": repo, "renderer": renderer},
+                  functools.partial(project_card, card, repo), offload=True)
+    return graph
 
-    # Redraw the language donut
-    update_language_donut(lang_stats, repos)
 
-    # Update the hero's live status bar
-    update_hero_stats()
+def write_patches(patches: Dict[str, regions.Patch]) -> List[str]:
+    """Apply every file's patch in one batch; the regions (or files) that changed.
+
+    A patch is either a {region: text} map or a whole new document (which
+    may create its file). Each file is read once, unchanged regions are
+    skipped, and only files with a real change are (atomically) rewritten.
+    """
+    if not patches:
+        return []
+    print("💾 Writing...")
+    changed = []
+    for path, patch in patches.items():
+        if not isinstance(patch, str) and not os.path.exists(path):
+            print(f"❌ {path} not found!")
+            sys.exit(1)
+        with tracing.span("patch_file", path=path) as span:
+            updated = regions.patch_file(path, patch)
+            span.set(changed=len(updated))
+        if not updated:
+            print(f"✅ {path} already up to date")
+        elif isinstance(patch, str):
+            print(f"✅ {path} updated")
+        else:
+            print(f"✅ {path} updated ({', '.join(u[len(path) + 1:] for u in updated)} changed)")
+        changed += updated
+    return changed
+
+
+def run_fetch_stage(sources: Dict[str, Tuple[Callable, float, bool]]) -> Dict[str, object]:
+    """Run every network source at once and collect what each one returned.
+
+    sources maps a name to (fetch, timeout in seconds, required). The sources
+    share nothing, so they run side by side and the stage takes as long as
+    the slowest one rather than all of them added up. A source that raises or
+    overruns its timeout comes back as None — its renderer keeps the previous
+    output — without holding up or cancelling the others. Only a required
+    source failing ends the run.
+
+    Each fetch runs on a daemon thread: a pool's workers are joined when the
+    interpreter exits, so one stuck in a fetch would hold the run open long
+    after its timeout. A thread left behind here is simply dropped at exit.
+    """
+    print(f"🌐 Fetching {', '.join(sources)} concurrently...")
+    outcomes = {}
+
+    def timed(name: str, fetch: Callable):
+        try:
+            with tracing.span(f"fetch:{name}"):
+                outcomes[name] = (fetch(), None, time.monotonic())
+        except (Exception, SystemExit) as e:  # reported below, not on the thread
+            outcomes[name] = (None, e, time.monotonic())
+
+    started = time.monotonic()
+    threads = {name: threading.Thread(target=timed, args=(name, fetch), name=f"fetch-{name}", daemon=True)
+               for name, (fetch, _, _) in sources.items()}
+    for thread in threads.values():
+        thread.start()
+
+    results = {}
+    for name, (_, timeout, required) in sources.items():
+        threads[name].join(timeout=max(0.0, started + timeout - time.monotonic()))
+        results[name], error, finished = outcomes.get(name, (None, None, None))
+        if finished is None:
+            print(f"⚠️  {name} gave no answer within {timeout:.0f}s")
+        elif error is not None:
+            print(f"⚠️  {name} failed ({error!r})")
+        else:
+            print(f"   {name} ✓ {finished - started:.1f}s")
+        if results[name] is None and required:
+            print(f"❌ Cannot continue without {name}")
+            sys.exit(1)
+    return results
+
+
+def report_changes(changed: List[str]):
+    """Say what this run changed, and hand it to the workflow when in Actions.
+
+    `changed` (true/false) and `regions` land in $GITHUB_OUTPUT, so the
+    commit steps can be skipped without diffing the tree.
+    """
+    print(f"\n🗂️  Changed: {', '.join(changed) if changed else 'nothing'}")
+    output = os.environ.get("GITHUB_OUTPUT")
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(f"changed={'true' if changed else 'false'}\n")
+            f.write(f"regions={' '.join(changed)}\n")
+
+
+def update(ingest: str = "cached"):
+    """One full update: fetch, render what is stale, write, report"""
+    print("🚀 Starting automated profile update...")
+    print(f"⏰ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    # Fetch everything up front, all at once; nothing below touches the network.
+    # GitHub is one batched stream (repos + calendar), aggregated as it arrives.
+    list_repos = {"cached": iter_repos_cached, "stream": iter_repos,
+                  "list": get_all_repos}[ingest]
+    with tracing.span("fetch"):
+        fetched = run_fetch_stage({
+            "github": (lambda: fetch_github(list_repos, cards=[c["repo"] for c in PROJECT_CARDS]), 90, True),
+            "writing": (fetch_velog_writing, 20, False),
+        })
+    summary = fetched["github"]["summary"]
+    lang_stats = summary["lang_stats"]
+
+    # Render only what the inputs say is out of date, then write it in one batch.
+    graph = artifact_graph(summary, fetched["github"]["contributions"], fetched["github"]["calendar"],
+                           fetched["writing"], cards=PROJECT_CARDS)
+    with tracing.span("render"):
+        patches = graph.build()
+    with tracing.span("write"):
+        changed = write_patches(patches)
+        graph.record()
+    report_changes(changed)
 
     print("\n✨ Profile update complete!")
     print(f"📊 Languages: {len(lang_stats)}")
 
 
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ingest", choices=("cached", "stream", "list"), default="cached",
+                        help="page through every repo, fetching only changed language "
+                             "breakdowns (default) or all of them, or take gh repo list's first 100")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a Chrome/Perfetto trace of the run's stages and calls")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write a JSON summary of span timings, bytes and cache counters")
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument("--record", metavar="PATH",
+                         help="save every GitHub and feed response to a fixture file (.json.gz)")
+    sources.add_argument("--replay", metavar="PATH",
+                         help="answer every request from a recorded fixture file, offline")
+    args = parser.parse_args()
+    if args.trace or args.metrics:
+        tracing.enable()
+    if args.record:
+        fixtures.record(args.record)
+    elif args.replay:
+        fixtures.replay(args.replay)
+        print(f"📼 Replaying {args.replay}")
+    try:
+        with tracing.span("run"):
+            update(args.ingest)
+    finally:
+        if args.record:
+            print(f"📼 {fixtures.save()} responses recorded to {args.record}")
+        if args.trace:
+            tracing.write_chrome_trace(args.trace)
+            print(f"🧭 Trace written to {args.trace}")
+        if args.metrics:
+            tracing.write_summary(args.metrics)
+            print(f"🧭 Metrics written to {args.metrics}")
+
 if __name__ == "__main__":
     main()